@@ -1,6 +1,8 @@
 import nest_asyncio
 import nltk
 import os
+import importlib
+from app.utils.registry import registry
 
 # Apply nest_asyncio to solve event loop issues with LlamaIndex on servers
 nest_asyncio.apply()
@@ -20,7 +22,8 @@ def init_nltk():
         except Exception:
             pass
 
-init_nltk()
+# Dipanggil saat pertama dibutuhkan (index LlamaIndex, pycuan), bukan saat import
+registry.register('nltk', init_nltk, fork_safe=True)
 
 from loguru import logger
 from flask import Flask, request, jsonify
@@ -33,7 +36,41 @@ from config import Config
 db = SQLAlchemy()
 migrate = Migrate()
 
-def create_app(config_class=Config):
+# Blueprint per profil deployment: news (API baca), ml (inferensi), ingest (crawler + pipeline).
+# Modul route hanya di-import jika profilnya aktif, jadi worker news tidak memuat dependensi ML.
+APP_PROFILES = ('all', 'news', 'ml', 'ingest')
+BLUEPRINTS = [
+    # (modul, nama blueprint, url_prefix, profil)
+    ("app.routes.cluster.route", "cluster_bp", "/cluster", ("ml",)),
+    ("app.routes.bias.route", "bias_bp", "/bias", ("ml",)),
+    ("app.routes.hoax.route", "hoax_bp", "/hoax", ("ml",)),
+    ("app.routes.ideology.route", "ideology_bp", "/ideology", ("ml",)),
+    ("app.routes.classify.route", "classify_bp", "/classify", ("ml",)),
+    ("app.routes.embedding.route", "embedding_bp", "/embedding", ("ml",)),
+    ("app.routes.title.route", "title_bp", "/title", ("ml",)),
+    ("app.routes.summary.route", "summary_bp", "/summary", ("ml",)),
+    ("app.routes.analyze.route", "analyze_bp", "/analyze", ("ml",)),
+    ("app.routes.cleaned.route", "cleaned_bp", "/cleaned", ("ml",)),
+    ("app.routes.separate.route", "separate_bp", "/separate", ("ml",)),
+    ("app.routes.process.route", "process_bp", "/process-all", ("ml",)),
+    ("app.routes.antipode.route", "antipode_bp", "/antipode", ("ml",)),
+    ("app.routes.ner.route", "ner_bp", "/ner", ("ml",)),
+    ("app.routes.crawler.route", "crawler_bp", "/crawlers", ("ingest",)),
+    ("app.routes.news.route", "news_bp", "/news", ("news",)),
+    ("app.routes.health.route", "health_bp", "/health", ("news", "ml", "ingest")),
+]
+
+def register_blueprints(app, profile):
+    if profile not in APP_PROFILES:
+        raise ValueError(f"Unknown APP_PROFILE '{profile}', expected one of {', '.join(APP_PROFILES)}")
+
+    for module_name, blueprint_name, url_prefix, profiles in BLUEPRINTS:
+        if profile != 'all' and profile not in profiles:
+            continue
+        blueprint = getattr(importlib.import_module(module_name), blueprint_name)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+
+def create_app(config_class=Config, profile=None):
     app = Flask(__name__)
     CORS(app, resources={
         r"/*": {"origins": '*'}
@@ -62,36 +99,12 @@ def create_app(config_class=Config):
 
 
     # --- Register blueprints ---
-    from app.routes.cluster.route import cluster_bp
-    from app.routes.bias.route import bias_bp
-    from app.routes.hoax.route import hoax_bp
-    from app.routes.ideology.route import ideology_bp
-    from app.routes.embedding.route import embedding_bp
-    from app.routes.title.route import title_bp
-    from app.routes.summary.route import summary_bp
-    from app.routes.analyze.route import analyze_bp
-    from app.routes.cleaned.route import cleaned_bp
-    from app.routes.separate.route import separate_bp
-    from app.routes.process.route import process_bp
-    from app.routes.antipode.route import antipode_bp
-    from app.routes.ner.route import ner_bp
-    from app.routes.crawler.route import crawler_bp
-    from app.routes.news.route import news_bp
-    
-    app.register_blueprint(cluster_bp, url_prefix="/cluster")
-    app.register_blueprint(bias_bp, url_prefix="/bias")
-    app.register_blueprint(hoax_bp, url_prefix="/hoax")
-    app.register_blueprint(ideology_bp, url_prefix="/ideology")
-    app.register_blueprint(embedding_bp, url_prefix="/embedding")
-    app.register_blueprint(title_bp, url_prefix="/title")
-    app.register_blueprint(summary_bp, url_prefix="/summary")
-    app.register_blueprint(analyze_bp, url_prefix="/analyze")
-    app.register_blueprint(cleaned_bp, url_prefix="/cleaned")
-    app.register_blueprint(separate_bp, url_prefix="/separate")
-    app.register_blueprint(process_bp, url_prefix="/process-all")
-    app.register_blueprint(antipode_bp, url_prefix="/antipode")
-    app.register_blueprint(ner_bp, url_prefix="/ner")
-    app.register_blueprint(crawler_bp, url_prefix="/crawlers")
-    app.register_blueprint(news_bp, url_prefix="/news")
+    register_blueprints(app, profile or app.config.get('APP_PROFILE', 'all'))
+
+    # --- CLI commands ---
+    from app.commands import schema_cli, embeddings_cli, ner_cli
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(embeddings_cli)
+    app.cli.add_command(ner_cli)
 
     return app
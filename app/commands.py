@@ -0,0 +1,127 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text, inspect
+from app import db
+from app.utils.vectors import pack_vector, is_legacy_json, EMBEDDING_DTYPE, DTYPE_TAGS
+
+schema_cli = AppGroup('schema', help="Kelola skema database.")
+
+def schema_changes():
+    # Bandingkan model dengan database: tabel, kolom dan index yang belum ada
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    changes = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            changes.append(('table', table, None))
+            continue
+
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                changes.append(('column', table, column))
+
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                changes.append(('index', table, index))
+    return changes
+
+@schema_cli.command('upgrade')
+@click.option('--dry-run', is_flag=True, help="Tampilkan perubahan tanpa menjalankannya.")
+def upgrade_schema(dry_run):
+    """Tambahkan tabel, kolom dan index baru dari app/model.py ke database yang sudah ada."""
+    dialect = db.engine.dialect
+    changes = schema_changes()
+    if not changes:
+        click.echo("Schema is up to date.")
+        return
+
+    with db.engine.begin() as conn:
+        for kind, table, item in changes:
+            if kind == 'table':
+                click.echo(f"Create table {table.name}")
+                if not dry_run:
+                    table.create(conn)
+            elif kind == 'column':
+                # Kolom baru selalu nullable, jadi aman untuk tabel yang sudah berisi
+                column_type = item.type.compile(dialect=dialect)
+                click.echo(f"Add column {table.name}.{item.name} {column_type}")
+                if not dry_run:
+                    quote = dialect.identifier_preparer.quote
+                    conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(item.name)} {column_type}"))
+            else:
+                click.echo(f"Create index {item.name} on {table.name}")
+                if not dry_run:
+                    item.create(conn)
+
+    click.echo("Dry run, nothing changed." if dry_run else f"Applied {len(changes)} schema changes.")
+
+
+embeddings_cli = AppGroup('embeddings', help="Kelola penyimpanan embedding artikel.")
+
+# Ubah tipe kolom dari TEXT ke BLOB; isi JSON lama tetap utuh sebagai bytes
+ALTER_EMBEDDING_COLUMN = {
+    'mysql': "ALTER TABLE articles MODIFY embedding MEDIUMBLOB",
+    'mariadb': "ALTER TABLE articles MODIFY embedding MEDIUMBLOB",
+    'postgresql': "ALTER TABLE articles ALTER COLUMN embedding TYPE BYTEA USING convert_to(embedding, 'UTF8')",
+}
+
+@embeddings_cli.command('migrate')
+@click.option('--batch-size', default=500, show_default=True, help="Jumlah baris per commit.")
+@click.option('--dtype', type=click.Choice(list(DTYPE_TAGS)), default=EMBEDDING_DTYPE, show_default=True)
+@click.option('--skip-alter', is_flag=True, help="Jangan ubah tipe kolom (sudah BLOB).")
+def migrate_embeddings(batch_size, dtype, skip_alter):
+    """Konversi Article.embedding dari JSON text ke blob float32/float16."""
+    dialect = db.engine.dialect.name
+    if not skip_alter and dialect in ALTER_EMBEDDING_COLUMN:
+        click.echo(f"Altering articles.embedding column ({dialect})")
+        db.session.execute(text(ALTER_EMBEDDING_COLUMN[dialect]))
+        db.session.commit()
+
+    last_id = 0
+    converted = 0
+    while True:
+        # Baca nilai mentah tanpa lewat tipe Vector supaya format lama terdeteksi
+        rows = db.session.execute(
+            text(
+                "SELECT id, embedding FROM articles "
+                "WHERE id > :last_id AND embedding IS NOT NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": batch_size}
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for row_id, raw in rows:
+            if is_legacy_json(raw):
+                if not isinstance(raw, str):
+                    raw = bytes(raw).decode('utf-8')
+                updates.append({"id": row_id, "embedding": pack_vector(raw, dtype)})
+
+        if updates:
+            db.session.execute(text("UPDATE articles SET embedding = :embedding WHERE id = :id"), updates)
+            db.session.commit()
+
+        converted += len(updates)
+        last_id = rows[-1][0]
+        click.echo(f"Converted {converted} embeddings (last id {last_id})")
+
+    click.echo(f"Done. Converted {converted} embeddings to {dtype}.")
+
+
+ner_cli = AppGroup('ner', help="Kelola model NER.")
+
+@ner_cli.command('export-onnx')
+@click.option('--output-dir', default=None, help="Default: folder dari NER_ONNX_PATH.")
+@click.option('--no-quantize', is_flag=True, help="Simpan model fp32 saja tanpa kuantisasi int8.")
+@click.option('--opset', default=14, show_default=True)
+def export_ner_onnx(output_dir, no_quantize, opset):
+    """Export model NER (app/model/ner) ke ONNX dengan kuantisasi dinamis int8."""
+    from app.utils.ner_onnx import export_onnx
+
+    path = export_onnx(output_dir=output_dir, quantize=not no_quantize, opset=opset)
+    click.echo(f"Exported NER model to {path}. Set NER_BACKEND=onnx to serve it.")
@@ -1,4 +1,24 @@
+import numpy as np
 from app import db
+from app.utils.vectors import pack_vector, unpack_vector
+
+
+class Vector(db.TypeDecorator):
+    # Embedding disimpan sebagai blob float32/float16 dan dibaca sebagai numpy array
+    impl = db.LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return pack_vector(value)
+
+    def process_result_value(self, value, dialect):
+        return unpack_vector(value)
+
+    def compare_values(self, x, y):
+        if x is None or y is None:
+            return x is y
+        return np.array_equal(np.asarray(x), np.asarray(y))
+
 
 class Article(db.Model):
     __tablename__ = 'articles'
@@ -9,12 +29,22 @@ class Article(db.Model):
     image = db.Column(db.String(500))
     date = db.Column(db.String(100))
     content = db.Column(db.Text)
-    embedding = db.Column(db.Text)  
+    cleaned = db.Column(db.Text)
+    content_hash = db.Column(db.String(64), index=True)
+    embedding = db.Column(Vector(length=16777215))
     bias = db.Column(db.String(50))
     hoax = db.Column(db.String(50))
     ideology = db.Column(db.String(50))
+    cluster = db.Column(db.Integer, index=True)
+    entities_extracted_at = db.Column(db.DateTime, index=True)
     title_index = db.Column(db.Integer, db.ForeignKey('title.title_index'), index=True)
 
+    def to_dict(self):
+        data = {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        if data['embedding'] is not None:
+            data['embedding'] = data['embedding'].tolist()
+        return data
+
 class Title(db.Model):
     __tablename__ = 'title'
     id = db.Column(db.Integer, primary_key=True)
@@ -25,4 +55,28 @@ class Title(db.Model):
     analysis = db.Column(db.Text)
     keyword = db.Column(db.Text)
     date = db.Column(db.DateTime)
-    image = db.Column(db.String(255))
\ No newline at end of file
+    image = db.Column(db.String(255))
+
+class ArticleEntity(db.Model):
+    # Entitas (PER/LOC/ORG) hasil NER per artikel, diisi oleh /crawlers/entities
+    __tablename__ = 'article_entities'
+    id = db.Column(db.Integer, primary_key=True)
+    article_id = db.Column(db.Integer, db.ForeignKey('articles.id'), nullable=False, index=True)
+    entity = db.Column(db.String(255), nullable=False, index=True)
+    label = db.Column(db.String(10), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=1)
+
+class TitleEntity(db.Model):
+    # Agregat ArticleEntity per grup berita; dicari lewat (entity_key, date) oleh /news/entity
+    __tablename__ = 'title_entities'
+    __table_args__ = (
+        db.Index('ix_title_entities_entity_date', 'entity_key', 'date'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    title_index = db.Column(db.Integer, db.ForeignKey('title.title_index'), nullable=False, index=True)
+    entity = db.Column(db.String(255), nullable=False)
+    entity_key = db.Column(db.String(255), nullable=False)
+    label = db.Column(db.String(10), nullable=False)
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    mentions = db.Column(db.Integer, nullable=False, default=0)
+    date = db.Column(db.DateTime)
\ No newline at end of file
@@ -2,10 +2,7 @@ from flask import Blueprint, request, jsonify
 import pandas as pd
 import numpy as np
 from app.utils.mainfunctions import dfEmbedding, topSimilarArticles
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.core import Settings
-
-Settings.embed_model = OpenAIEmbedding(model="text-embedding-ada-002")
+from app.utils.embeddings import embed_texts
 
 antipode_bp = Blueprint('antipode', __name__)
 
@@ -39,7 +36,7 @@ def antipode():
 
         # Compute embedding for the article
         if 'embedding' not in article or not isinstance(article['embedding'], (list, np.ndarray)):
-            article['embedding'] = Settings.embed_model.get_text_embedding(article['content'])
+            article['embedding'] = embed_texts([article['content']])[0]
 
         # Dapatkan embedding dari df jika belum ada.
         df = dfEmbedding(df)
@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify
+from app.utils.mainfunctions import classify_all
+
+classify_bp = Blueprint("classify", __name__)
+
+@classify_bp.route('/', methods=['POST'])
+def classifyAPI():
+    try:
+        input_data = request.json
+        if 'content' not in input_data:
+            return jsonify({"error": "Invalid input, 'content' field is required"}), 400
+
+        content = input_data['content']
+
+        if isinstance(content, str):
+            return jsonify(classify_all(content)[0]), 200
+
+        if not isinstance(content, list) or not all(isinstance(item, str) for item in content):
+            return jsonify({"error": "'content' must be either a string or a list of strings"}), 400
+
+        return jsonify({"classify": classify_all(content)}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
@@ -13,7 +13,9 @@ def cleaned():
 
         content = input_data['content']
 
-        cleaned = cleaned_service(content)
+        workers = input_data.get('workers')
+
+        cleaned = cleaned_service(content, workers=workers)
         
         return jsonify({"cleaned": cleaned}), 200
 
@@ -1,18 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+import numpy as np
 from app import db, logger
-import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from app.services.crawlers import main as run_crawlers  
-from app.model  import Article , Title
+from app.model  import Article , Title, ArticleEntity
 from app.services.analysis import (
-    predict_cluster , cleaned_service , embedding_service, separate_service,
+    predict_clusters, separate_service,
     mode_cluster as get_mode_cluster, generate_title_service, 
-    summarize_service, analyze_service,
+    summarize_service, analyze_service, group_content_service, find_processed, copy_processed,
+    refresh_title_entities,
 )       
-from app.utils.mainfunctions import (
-    predictBias, predictHoax, predictIdeology
-)
+from app.utils.mainfunctions import classify_all
+from app.utils.hashing import content_hash
+from app.utils.embeddings import embed_texts, EMBEDDING_BATCH_SIZE
+from app.utils.llm import LLM_COMBINED_MODE, GROUP_CONTENT_FIELDS
+from app.utils.grouping import group_centroids, assign_to_centroids
+from app.utils.ner import extract_entities
 
 crawler_bp = Blueprint('crawler', __name__)
 
@@ -58,7 +62,8 @@ def run_crawlers_endpoint():
                     url=url,
                     image=image,
                     date=date,
-                    content=content
+                    content=content,
+                    content_hash=content_hash(content)
                 )
                 
                 # Tambahkan ke session
@@ -96,109 +101,62 @@ def update_articles():
             }), 200
         
         processed_count = 0
-        updated_clusters = 0
+        reused_count = 0
         update_data = []
 
-        def _run_parallel_services(article):
-            results = {
-                "cluster": None,
-                "bias": None,
-                "hoax": None,
-                "cleaned": None,
-                "embedding": None,
-            }
-
-            def _embedding_task():
-                data_for_embedding = [{
-                    "id": article.id,
-                    "title": article.title,
-                    "content": article.content
-                }]
-                embeddings = embedding_service(data_for_embedding)
-                if embeddings and len(embeddings) > 0:
-                    return json.dumps(embeddings[0])
-                return None
-
-            tasks = {
-                "cluster": lambda: predict_cluster(article.content),
-                "bias": lambda: predictBias(article.content),
-                "hoax": lambda: predictHoax(article.content),
-                "cleaned": lambda: cleaned_service(article.content),
-                "embedding": _embedding_task,
-            }
-
-            max_workers = min(5, len(tasks))
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(func): name for name, func in tasks.items()}
-                for future in as_completed(futures):
-                    name = futures[future]
-                    try:
-                        results[name] = future.result()
-                    except Exception:
-                        results[name] = None
-
-            ideology_result = None
-            if results["cleaned"]:
-                ideology_result = predictIdeology(results["cleaned"])
-
-            return {
-                "cluster": results["cluster"],
-                "bias": results["bias"],
-                "hoax": results["hoax"],
-                "cleaned": results["cleaned"],
-                "ideology": ideology_result,
-                "embedding": results["embedding"],
-            }
-        
+        # Artikel dengan konten yang sudah pernah diproses cukup menyalin hasilnya
         for article in articles:
-            try:
-                results = _run_parallel_services(article)
-                
-                # Kumpulkan hasil
-                update_data.append({
-                    'article': article,
-                    'cluster': results['cluster'],
-                    'bias': results['bias'],
-                    'hoax': results['hoax'],
-                    'cleaned': results['cleaned'],
-                    'ideology': results['ideology'],
-                    'embedding': results['embedding']
-                })
-                
-                processed_count += 1
-                
-            except Exception as article_error:
-                continue
+            if not article.content_hash:
+                article.content_hash = content_hash(article.content)
+
+        processed_rows = find_processed(article.content_hash for article in articles)
+
+        pending = {}
+        for article in articles:
+            source = processed_rows.get(article.content_hash)
+            if source is not None:
+                copy_processed(source, article)
+                reused_count += 1
+            else:
+                pending.setdefault(article.content_hash, []).append(article)
+
+        # Konten duplikat dalam satu batch cukup diproses sekali
+        unique_articles = [group[0] for group in pending.values()]
+
+        # Klasifikasi, embedding dan topik dijalankan per chunk; chunk yang gagal diulang per artikel
+        for article, result in _analyze_articles(unique_articles):
+            update_data.append({'article': article, **result})
+            processed_count += 1
         
         # Update database
         for item in update_data:
-            article = item['article']
-            if item['bias'] is not None:
-                article.bias = item['bias']
-            if item['hoax'] is not None:
-                article.hoax = item['hoax']
-            if item['cleaned'] is not None:
-                article.cleaned = item['cleaned']
-            if item['ideology'] is not None:
-                article.ideology = item['ideology']
-            if item['embedding'] is not None:
-                article.embedding = item['embedding']
-
-            # ⬇️ Update cluster langsung ke Title (jika article punya title_index)
-            if item['cluster'] is not None and article.title_index:
-                title_record = Title.query.filter_by(title_index=article.title_index).first()
-                if title_record:
-                    title_record.cluster = str(item['cluster'])  # simpan sebagai string
-                    updated_clusters += 1
-
+            for article in pending[item['article'].content_hash]:
+                if item['bias'] is not None:
+                    article.bias = item['bias']
+                if item['hoax'] is not None:
+                    article.hoax = item['hoax']
+                if item['cleaned'] is not None:
+                    article.cleaned = item['cleaned']
+                if item['ideology'] is not None:
+                    article.ideology = item['ideology']
+                if item['embedding'] is not None:
+                    article.embedding = item['embedding']
+                if item['cluster'] is not None:
+                    article.cluster = item['cluster']
+
+        # ⬇️ Update cluster Title dari modus topik artikel-artikelnya
+        title_indices = {article.title_index for article in articles if article.title_index}
+        updated_clusters = _update_title_clusters(title_indices)
 
         db.session.commit()
         
         return jsonify({
             "success": True,
             "message": f"Processed {processed_count} articles. "
+                       f"Reused results for {reused_count} unchanged articles. "
                        f"Updated cluster for {updated_clusters} Title records.",
             "total_articles": len(articles),
+            "reused_articles": reused_count,
             "updated_clusters": updated_clusters
         }), 200
 
@@ -206,6 +164,111 @@ def update_articles():
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 400
 
+def _analyze_chunk(articles):
+    contents = [article.content for article in articles]
+
+    # Preprocessing + bias/hoax/ideology untuk semua artikel dalam satu batch
+    classifications = classify_all(contents)
+
+    # Semua konten di-embed sekaligus, topik dihitung dari embedding yang sama
+    embeddings = embed_texts(contents)
+    clusters = predict_clusters(embeddings=embeddings)
+
+    return [
+        {**classification, 'embedding': embedding, 'cluster': cluster}
+        for classification, embedding, cluster in zip(classifications, embeddings, clusters)
+    ]
+
+def _analyze_articles(articles, chunk_size=EMBEDDING_BATCH_SIZE):
+    # Satu teks atau batch yang gagal tidak boleh membatalkan seluruh run:
+    # chunk yang error diulang satu per satu dan artikel yang tetap gagal dilewati
+    for start in range(0, len(articles), chunk_size):
+        chunk = articles[start:start + chunk_size]
+        try:
+            yield from zip(chunk, _analyze_chunk(chunk))
+            continue
+        except Exception as e:
+            logger.warning(f"Batch of {len(chunk)} articles failed, retrying one by one: {str(e)}")
+
+        for article in chunk:
+            try:
+                yield article, _analyze_chunk([article])[0]
+            except Exception as article_error:
+                logger.exception(f"Failed to process article {article.id}: {str(article_error)}")
+
+def _topic_mode(title_index):
+    # Modus topik artikel dalam satu grup, dihitung langsung di database
+    count = db.func.count(Article.id)
+    row = (
+        db.session.query(Article.cluster, count)
+        .filter(Article.title_index == title_index, Article.cluster.isnot(None))
+        .group_by(Article.cluster)
+        .order_by(count.desc(), Article.cluster)
+        .first()
+    )
+    return row[0] if row else None
+
+def _update_title_clusters(title_indices):
+    updated = 0
+    for title_record in Title.query.filter(Title.title_index.in_(title_indices)).all():
+        mode_cluster = _topic_mode(title_record.title_index)
+        if mode_cluster is not None:
+            title_record.cluster = str(mode_cluster)  # simpan sebagai string
+            updated += 1
+    return updated
+
+def _assign_topics(articles):
+    # Pakai embedding yang sudah tersimpan; provider hanya dipanggil untuk artikel tanpa embedding
+    pending = [article for article in articles if article.cluster is None]
+    if not pending:
+        return
+
+    missing = [article for article in pending if article.embedding is None]
+    if missing:
+        for article, embedding in zip(missing, embed_texts([article.content for article in missing])):
+            # Samakan dengan nilai yang dibaca dari kolom Vector (numpy array)
+            article.embedding = np.asarray(embedding, dtype=np.float32)
+
+    clusters = predict_clusters(embeddings=[article.embedding for article in pending])
+    for article, cluster in zip(pending, clusters):
+        article.cluster = cluster
+
+def _assign_to_existing_groups(articles, threshold, window_days):
+    # Grup yang masih relevan: diproses dalam window terakhir, atau belum diproses tetapi
+    # punya artikel dalam window (Article.date berformat YYYY-MM-DD)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=window_days)
+    unprocessed_recent = (
+        db.session.query(Article.title_index)
+        .join(Title, Title.title_index == Article.title_index)
+        .filter(Title.date.is_(None))
+        .group_by(Article.title_index)
+        .having(db.func.max(Article.date) >= cutoff.date().isoformat())
+    )
+    recent_titles = db.session.query(Title.title_index).filter(
+        (Title.date >= cutoff) | (Title.title_index.in_(unprocessed_recent))
+    )
+
+    rows = (
+        db.session.query(Article.title_index, Article.embedding)
+        .filter(Article.title_index.in_(recent_titles), Article.embedding.isnot(None))
+        .all()
+    )
+    candidates = [article for article in articles if article.embedding is not None]
+    if not rows or not candidates:
+        return 0
+
+    title_indices, centroids = group_centroids(
+        [row.embedding for row in rows], [row.title_index for row in rows]
+    )
+    matches = assign_to_centroids([article.embedding for article in candidates], centroids, threshold)
+
+    attached = 0
+    for article, match in zip(candidates, matches):
+        if match >= 0:
+            article.title_index = int(title_indices[match])
+            attached += 1
+    return attached
+
 @crawler_bp.route("/group", methods=["GET", "POST"])
 def group_articles():
     try:
@@ -217,6 +280,31 @@ def group_articles():
                 "count": 0
             }), 200
 
+        total_articles = len(articles)
+        attached_count = 0
+
+        # Mode incremental: cocokkan dulu dengan centroid grup yang sudah ada
+        incremental = request.args.get('incremental', 'true').lower() != 'false'
+        if incremental:
+            attached_count = _assign_to_existing_groups(
+                articles,
+                threshold=request.args.get('threshold', current_app.config['GROUP_ASSIGN_THRESHOLD'], type=float),
+                window_days=request.args.get('window_days', current_app.config['GROUP_WINDOW_DAYS'], type=int),
+            )
+            attached_indices = {article.title_index for article in articles if article.title_index is not None}
+            refresh_title_entities(attached_indices)
+            articles = [article for article in articles if article.title_index is None]
+
+        if not articles:
+            db.session.commit()
+            return jsonify({
+                "success": True,
+                "message": f"Attached {attached_count} articles to existing groups",
+                "articles_count": total_articles,
+                "attached_count": attached_count,
+                "clusters_count": 0
+            }), 200
+
         # Ambil data artikel
         articles_data = []
         for article in articles:
@@ -224,7 +312,7 @@ def group_articles():
                 'id': article.id,
                 'title': article.title,
                 'content': article.content,
-                'embedding': json.loads(article.embedding) if article.embedding else None
+                'embedding': article.embedding
             })
         # Dapatkan cluster index baru
         clusters = separate_service(articles_data)
@@ -243,13 +331,19 @@ def group_articles():
         for article, new_idx in zip(articles, new_title_indices):
             article.title_index = new_idx
 
+        # Entitas grup baru (artikel yang sudah melalui NER)
+        db.session.flush()
+        refresh_title_entities(unique_title_indices)
+
         # STEP 3: Commit sekali
         db.session.commit()
 
         return jsonify({
             "success": True,
-            "message": f"Successfully grouped {len(articles)} articles into {len(unique_title_indices)} clusters",
-            "articles_count": len(articles),
+            "message": f"Attached {attached_count} articles to existing groups. "
+                       f"Successfully grouped {len(articles)} articles into {len(unique_title_indices)} clusters",
+            "articles_count": total_articles,
+            "attached_count": attached_count,
             "clusters_count": len(unique_title_indices)
         }), 200
 
@@ -259,6 +353,23 @@ def group_articles():
 
 
 
+SPLIT_CONTENT_TASKS = {
+    'title': generate_title_service,
+    'summary': summarize_service,
+    'analysis': analyze_service,
+}
+
+def _group_content_tasks():
+    # Mode gabungan: satu panggilan menghasilkan title, summary, dan analysis sekaligus
+    if LLM_COMBINED_MODE:
+        return {'content': group_content_service}
+    return SPLIT_CONTENT_TASKS
+
+def _run_in_context(app, func, *args):
+    # Service memakai query ORM, jadi thread worker butuh app context sendiri
+    with app.app_context():
+        return func(*args)
+
 @crawler_bp.route("/process", methods=["GET", "POST"])
 def process_articles():
     try:
@@ -274,71 +385,109 @@ def process_articles():
                 "count": 0
             }), 200
 
+        app = current_app._get_current_object()
+        max_workers = request.args.get('workers', current_app.config['PROCESS_MAX_WORKERS'], type=int)
+
         processed_count = 0
+        failed_groups = []
+        groups = {}
 
-        for record in title_records:
-            title_index = record.title_index
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {}
 
-            # Ambil semua artikel di grup ini
-            group_articles = Article.query.filter_by(title_index=title_index).all()
-            if not group_articles:
-                continue
+            for record in title_records:
+                title_index = record.title_index
 
-            # Format untuk API lain dan hitung cluster untuk setiap artikel
-            formatted_articles = []
-            cluster_results = []
-            
-            for article in group_articles:
-                # Prediksi cluster untuk setiap artikel
-                cluster_result = predict_cluster(article.content)
-                cluster_results.append(cluster_result)
-
-                formatted_articles.append({
-                    'title': article.title,
-                    'content': article.content,
-                    'embedding': json.loads(article.embedding) if article.embedding else None,
-                    'bias': article.bias,
-                    'hoax': article.hoax,
-                    'ideology': article.ideology,
-                    'cluster': cluster_result  # Gunakan hasil prediksi langsung
-                })
-
-            # Hitung mode cluster dari hasil prediksi
-            from collections import Counter
-            if cluster_results:
-                mode_cluster = Counter(cluster_results).most_common(1)[0][0]
-            else:
-                mode_cluster = None
+                # Ambil semua artikel di grup ini
+                group_articles = Article.query.filter_by(title_index=title_index).all()
+                if not group_articles:
+                    continue
 
-            # title
-            new_title = generate_title_service(formatted_articles)
+                try:
+                    # Topik per artikel disimpan, hanya yang belum punya yang diprediksi
+                    _assign_topics(group_articles)
+                except Exception as e:
+                    logger.error(f"Failed to assign topics for group {title_index}: {str(e)}")
+                    failed_groups.append(title_index)
+                    continue
 
-            # summary
-            all_summary = summarize_service(formatted_articles)
+                # Format untuk API lain
+                formatted_articles = []
+                for article in group_articles:
+                    formatted_articles.append({
+                        'title': article.title,
+                        'content': article.content,
+                        'embedding': article.embedding.tolist() if article.embedding is not None else None,
+                        'bias': article.bias,
+                        'hoax': article.hoax,
+                        'ideology': article.ideology,
+                        'cluster': article.cluster
+                    })
+
+                # Hitung mode cluster dari topik yang tersimpan
+                db.session.flush()
+                mode_cluster = _topic_mode(title_index)
+
+                # Ambil image pertama yang ada
+                image_link = next((a.image.strip() for a in group_articles if a.image and a.image.strip()), None)
+
+                groups[title_index] = {
+                    'record': record,
+                    'cluster': mode_cluster,
+                    'image': image_link,
+                    'results': {},
+                    'failed': False,
+                }
+
+                # title, summary, dan analyze dijalankan bersamaan
+                for field, service in _group_content_tasks().items():
+                    future = executor.submit(_run_in_context, app, service, formatted_articles)
+                    futures[future] = (title_index, field)
+
+            # Simpan setiap grup segera setelah ketiga hasilnya selesai
+            for future in as_completed(futures):
+                title_index, field = futures[future]
+                group = groups[title_index]
+                if group['failed']:
+                    continue
 
-            # analyze
-            analysis = analyze_service(formatted_articles)
+                try:
+                    result = future.result()
+                    group['results'].update(result if field == 'content' else {field: result})
+                except Exception as e:
+                    logger.error(f"Failed to generate {field} for group {title_index}: {str(e)}")
+                    group['failed'] = True
+                    failed_groups.append(title_index)
+                    continue
 
-            # Ambil image pertama yang ada
-            image_link = next((a.image.strip() for a in group_articles if a.image and a.image.strip()), None)
+                if not all(name in group['results'] for name in GROUP_CONTENT_FIELDS):
+                    continue
 
-            # Update tabel Title
-            record.title = new_title
-            record.cluster = mode_cluster
-            record.all_summary = all_summary
-            record.analysis = analysis
-            record.date = datetime.now(timezone.utc)
-            record.image = image_link
+                # Update tabel Title
+                record = group['record']
+                record.title = group['results']['title']
+                record.cluster = group['cluster']
+                record.all_summary = group['results']['summary']
+                record.analysis = group['results']['analysis']
+                record.date = datetime.now(timezone.utc)
+                record.image = group['image']
 
-            processed_count += 1
+                # Tanggal grup ikut disalin ke indeks entitas
+                db.session.flush()
+                refresh_title_entities([title_index])
+
+                db.session.commit()
+                processed_count += 1
 
+        # Simpan topik artikel dari grup yang gagal juga
         db.session.commit()
 
         return jsonify({
             "success": True,
             "message": f"Successfully processed {processed_count} article groups",
             "total_groups": len(title_records),
-            "processed_groups": processed_count
+            "processed_groups": processed_count,
+            "failed_groups": failed_groups
         }), 200
 
     except Exception as e:
@@ -346,3 +495,67 @@ def process_articles():
         logger.exception(e)
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
+
+def _count_entities(entities):
+    # Hitung kemunculan per (entitas, label); ejaan dari kemunculan pertama dipertahankan
+    counts = {}
+    for text, label in entities:
+        key = (text.lower(), label)
+        if key in counts:
+            counts[key][2] += 1
+        else:
+            counts[key] = [text[:255], label, 1]
+    return counts.values()
+
+@crawler_bp.route("/entities", methods=["GET", "POST"])
+def extract_article_entities():
+    try:
+        limit = request.args.get('limit', current_app.config['ENTITY_JOB_LIMIT'], type=int)
+        batch_size = request.args.get('batch_size', current_app.config['ENTITY_JOB_BATCH_SIZE'], type=int)
+
+        articles = (
+            Article.query
+            .filter(Article.entities_extracted_at.is_(None), Article.content.isnot(None))
+            .order_by(Article.id)
+            .limit(limit)
+            .all()
+        )
+        if not articles:
+            return jsonify({
+                "success": True,
+                "message": "No articles waiting for entity extraction",
+                "count": 0
+            }), 200
+
+        processed_count = 0
+        entity_count = 0
+
+        # Satu panggilan NER per batch, commit per batch supaya progres tidak hilang
+        for start in range(0, len(articles), max(1, batch_size)):
+            batch = articles[start:start + batch_size]
+            results = extract_entities(article.content for article in batch)
+            extracted_at = datetime.now(timezone.utc)
+
+            for article, entities in zip(batch, results):
+                ArticleEntity.query.filter_by(article_id=article.id).delete()
+                for entity, label, count in _count_entities(entities):
+                    db.session.add(ArticleEntity(article_id=article.id, entity=entity, label=label, count=count))
+                    entity_count += 1
+                article.entities_extracted_at = extracted_at
+
+            db.session.flush()
+            refresh_title_entities(article.title_index for article in batch)
+            db.session.commit()
+            processed_count += len(batch)
+
+        return jsonify({
+            "success": True,
+            "message": f"Extracted {entity_count} entities from {processed_count} articles",
+            "processed_articles": processed_count,
+            "entities_count": entity_count
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error in extract_article_entities: {str(e)}")
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
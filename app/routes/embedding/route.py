@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 import pandas as pd
 from app.services.analysis import embedding_service
+from app.utils.embeddings import embedding_cache_stats
 
 
 embedding_bp = Blueprint('embedding', __name__)
@@ -13,4 +14,8 @@ def get_embedding():
         return jsonify({"embedding": embed}), 200
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
+
+@embedding_bp.route('/cache', methods=['GET'])
+def get_embedding_cache_stats():
+    return jsonify({"cache": embedding_cache_stats()}), 200
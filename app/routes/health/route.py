@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from app.utils.registry import registry
+
+health_bp = Blueprint("health", __name__)
+
+@health_bp.route('/live', methods=['GET'])
+def live():
+    return jsonify({"status": "ok"}), 200
+
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    # Siap menerima traffic setelah warmup model di worker ini selesai
+    status = registry.status()
+    return jsonify(status), 200 if status["ready"] else 503
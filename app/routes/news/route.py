@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from datetime import date, timedelta
 from app import db
-from app.model import Title, Article
+from app.model import Title, Article, TitleEntity
 from sqlalchemy import func, case,  desc
 from . import news_bp
 
@@ -179,13 +179,7 @@ def get_today_articles():
         # Ambil data sesuai verbose
         if verbose:
             articles = base_query.all()
-            result = [
-                {
-                    c.name: getattr(article, c.name)
-                    for c in article.__table__.columns
-                }
-                for article in articles
-            ]
+            result = [article.to_dict() for article in articles]
         else:
             articles = base_query.all()
             result = [
@@ -535,6 +529,71 @@ def search_title():
             "total": len(result)
         }), 200
 
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@news_bp.route("/entity", methods=["GET"])
+def get_entity_news():
+    try:
+        name = request.args.get('name', '').strip()
+        if not name:
+            return jsonify({"success": False, "error": "No entity name provided"}), 400
+
+        label = request.args.get('label')
+        days = request.args.get('days', type=int)
+        limit = request.args.get('limit', 50, type=int)
+
+        # Pakai indeks (entity_key, date) di title_entities. Satu grup bisa punya entitas yang
+        # sama dengan beberapa label (mis. PER dan ORG), jadi digabung per title_index
+        query = (
+            db.session.query(
+                TitleEntity.title_index,
+                func.max(TitleEntity.entity).label('entity'),
+                func.group_concat(TitleEntity.label).label('labels'),
+                func.max(TitleEntity.article_count).label('article_count'),
+                func.sum(TitleEntity.mentions).label('mentions'),
+                func.max(TitleEntity.date).label('date')
+            )
+            .filter(TitleEntity.entity_key == name.lower())
+        )
+        if label:
+            query = query.filter(TitleEntity.label == label.upper())
+        if days:
+            query = query.filter(TitleEntity.date >= date.today() - timedelta(days=days))
+
+        entities = query.group_by(TitleEntity.title_index).subquery()
+        rows = (
+            db.session.query(entities.c.entity, entities.c.labels, entities.c.article_count, entities.c.mentions, Title)
+            .join(Title, Title.title_index == entities.c.title_index)
+            .order_by(entities.c.date.desc())
+            .limit(limit)
+            .all()
+        )
+
+        result = [
+            {
+                'title_index': t.title_index,
+                'title': t.title,
+                'date': t.date,
+                'all_summary': t.all_summary,
+                'image': t.image,
+                'cluster': t.cluster,
+                'entity': entity,
+                'labels': sorted(labels.split(',')),
+                'article_count': article_count,
+                'mentions': int(mentions)
+            }
+            for entity, labels, article_count, mentions, t in rows
+        ]
+
+        return jsonify({
+            "success": True,
+            "data": result,
+            "total": len(result)
+        }), 200
+
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
\ No newline at end of file
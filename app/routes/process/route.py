@@ -1,13 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import pandas as pd
 import numpy as np
-import networkx as nx
-from sklearn.metrics.pairwise import cosine_similarity
 from app.utils.mainfunctions import completeDf, getClusters
+from app.utils.grouping import group_by_similarity
 from app.utils.llm import (
-    getTitle, create_documents, summarize_article, analyze_article
+    create_documents, generate_group_content, getQueryEngine, create_cuan_analysis
 )
 from app.utils.pycuan import main as pycuan_main
+from app.services.analysis import attach_processed
 
 process_bp = Blueprint("process", __name__)
 @process_bp.route('/', methods=['POST'])
@@ -24,34 +24,14 @@ def processAll():
             if col not in df.columns:
                 return jsonify({"error": f"Input must contain {col} field"}), 400
 
+        df = attach_processed(df)
         df = completeDf(df) # Dapatkan embedding, bersihin content, hoax, bias, ideology
         
         # Step 1: Cluster the articles
         embeddings = np.array(df['embedding'].to_list(), dtype=np.float32)
         similarity_threshold = 0.9
-        similarity_matrix = cosine_similarity(embeddings)
-
-        G = nx.Graph()
-        for i in range(len(similarity_matrix)):
-            for j in range(i + 1, len(similarity_matrix)):
-                if similarity_matrix[i, j] >= similarity_threshold:
-                    G.add_edge(i, j)
-
-        clusters = [list(component) for component in nx.connected_components(G)]
-        cluster_indices = [-1] * len(df)
-
-        # Assign a unique cluster index to each group
-        current_cluster_index = 0
-        for cluster in clusters:
-            for idx in cluster:
-                cluster_indices[idx] = current_cluster_index
-            current_cluster_index += 1
-
-        # For unclustered items, assign them unique indices starting from current_cluster_index
-        for idx, cluster_index in enumerate(cluster_indices):
-            if cluster_index == -1:
-                cluster_indices[idx] = current_cluster_index
-                current_cluster_index += 1
+        cluster_indices = group_by_similarity(embeddings, similarity_threshold)
+        current_cluster_index = max(cluster_indices) + 1 if cluster_indices else 0
         
         # Assign cluster indices to the DataFrame
         df['cluster_index'] = cluster_indices
@@ -67,12 +47,14 @@ def processAll():
 
             # Create documents for the current cluster
             cluster_documents = create_documents(cluster_df)
-            title = getTitle(cluster_documents)
+            content = generate_group_content(cluster_documents)
+            title = content['title']
+            analysis = content['analysis']
 
             if modeCluster == 6:
-                stock_symbol = 'FTT-USD'
-                start_date = '2022-11-14'
-                end_date = '2023-11-14'
+                stock_symbol = current_app.config['PYCUAN_STOCK_SYMBOL']
+                start_date = current_app.config['PYCUAN_START_DATE']
+                end_date = current_app.config['PYCUAN_END_DATE']
                 last_actual_day, last_actual_opening_price, forecast_date, first_forecast_opening_price, price_difference, percentage_change, final_sentiment, final_weight = pycuan_main(str(title), stock_symbol, start_date, end_date)
                 cuan_result = {
                     "last_actual_day": str(last_actual_day),
@@ -84,11 +66,10 @@ def processAll():
                     "final_sentiment": final_sentiment,
                     "final_weight": final_weight
                 }
-            else:
-                cuan_result = None
+                # Analisis finansial butuh title, jadi ditambahkan setelahnya
+                analysis += create_cuan_analysis(getQueryEngine(cluster_documents), cuan_result)
 
-            all_summary = summarize_article(cluster_documents)
-            analysis = analyze_article(cluster_documents, cuan_result)
+            all_summary = content['summary']
 
             # Append the results for the current cluster
             cluster_result = {
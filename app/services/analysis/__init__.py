@@ -6,4 +6,7 @@ from .embedding import *
 from .separate import *
 from .analyze import *
 from .title import * 
-from .summary import * 
\ No newline at end of file
+from .summary import * 
+from .content import *
+from .processed import *
+from .entities import *
@@ -1,7 +1,6 @@
-import pandas as pd
-from app.utils.mainfunctions import preprocessText  
+from app.utils.cleaning import preprocessText, clean_parallel
 
-def cleaned_service(content):
+def cleaned_service(content, workers=None):
 
     if isinstance(content, str):
         return preprocessText(content)
@@ -10,9 +9,7 @@ def cleaned_service(content):
         if not all(isinstance(item, str) for item in content):
             raise ValueError("All items in the 'content' list must be strings")
         
-        df = pd.DataFrame({'content': content})
-        df['cleaned'] = df['content'].swifter.apply(preprocessText)
-        return df['cleaned'].tolist()
+        return clean_parallel(content, workers=workers)
 
     else:
         raise TypeError("'content' must be either a string or a list of strings")
@@ -1,22 +1,36 @@
 import os
 import numpy as np
 import pandas as pd
-from app.utils.mainfunctions import loadClusterModel ,  dfEmbedding, getClusters
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.core import Settings
+from app.utils.mainfunctions import getClusterModel ,  dfEmbedding, getClusters
+from app.services.analysis.processed import attach_processed
+from app.utils.embeddings import embed_texts
+from app.utils.vectors import stack_vectors
 
-def predict_cluster(content: str) -> int:
+def predict_clusters(texts=None, embeddings=None) -> list:
+
+    if texts is None and embeddings is None:
+        raise ValueError("Either texts or embeddings must be provided")
 
-    os.environ['OPENAI_API_KEY'] = os.getenv('OPENAI_API_KEY')
+    # Embedding yang sudah ada dipakai langsung, sisanya di-embed dalam satu batch
+    if embeddings is None:
+        embeddings = [None] * len(texts)
+    embeddings = list(embeddings)
 
-    Settings.embed_model = OpenAIEmbedding(model="text-embedding-ada-002")
-    embedding = Settings.embed_model.get_text_embedding(content)
-    embedding = np.array(embedding, dtype=np.float32).reshape(1, -1)
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        if texts is None:
+            raise ValueError("texts are required for items without an embedding")
+        for i, embedding in zip(missing, embed_texts([texts[i] for i in missing])):
+            embeddings[i] = embedding
 
-    kmeans = loadClusterModel()
-    cluster = kmeans.predict(embedding)[0]
+    if not embeddings:
+        return []
 
-    return int(cluster)
+    clusters = getClusterModel().predict(stack_vectors(embeddings))
+    return [int(cluster) for cluster in clusters]
+
+def predict_cluster(content: str) -> int:
+    return predict_clusters(texts=[content])[0]
 
 
 def mode_cluster(data):
@@ -28,5 +42,7 @@ def mode_cluster(data):
     for col in ['title', 'content', 'embedding']:
         if col not in df.columns:
             raise ValueError(f"Input must contain {col} field")
+    df = attach_processed(df)
     df = dfEmbedding(df)
+    return getClusters(df)
 
@@ -0,0 +1,20 @@
+import pandas as pd
+from app.utils.llm import create_documents, generate_group_content
+from app.utils.mainfunctions import completeDf
+from app.services.analysis.processed import attach_processed
+
+def group_content_service(data):
+
+    if not isinstance(data, list):
+        raise TypeError("Input must be a list of news articles")
+    
+    df = pd.DataFrame(data)
+    for col in ['title', 'content', 'embedding']:
+        if col not in df.columns:
+            raise ValueError(f"Input must contain {col} field")
+
+    df = attach_processed(df)
+    df = completeDf(df)
+
+    documents = create_documents(df)
+    return generate_group_content(documents)
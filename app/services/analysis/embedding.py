@@ -1,5 +1,6 @@
 import pandas as pd
 from app.utils.mainfunctions import dfEmbedding
+from app.services.analysis.processed import attach_processed
 
 def embedding_service(data):
     if isinstance(data, dict):  
@@ -12,6 +13,7 @@ def embedding_service(data):
     if 'content' not in df.columns:
         raise ValueError("Input must contain 'content' field")
     
+    df = attach_processed(df)
     df = dfEmbedding(df)
     
     return df['embedding'].tolist()                                                                                                          
\ No newline at end of file
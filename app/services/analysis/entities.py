@@ -0,0 +1,46 @@
+from sqlalchemy import func
+from app import db
+from app.model import Article, ArticleEntity, Title, TitleEntity
+
+def refresh_title_entities(title_indices):
+    # Hitung ulang entitas per grup dari ArticleEntity artikel-artikelnya
+    title_indices = {idx for idx in title_indices if idx is not None}
+    if not title_indices:
+        return 0
+
+    TitleEntity.query.filter(TitleEntity.title_index.in_(title_indices)).delete(synchronize_session=False)
+
+    entity_key = func.lower(ArticleEntity.entity)
+    rows = (
+        db.session.query(
+            Article.title_index,
+            entity_key.label('entity_key'),
+            ArticleEntity.label,
+            func.min(ArticleEntity.entity).label('entity'),
+            func.count(func.distinct(Article.id)).label('article_count'),
+            func.sum(ArticleEntity.count).label('mentions'),
+        )
+        .join(Article, Article.id == ArticleEntity.article_id)
+        .filter(Article.title_index.in_(title_indices))
+        .group_by(Article.title_index, entity_key, ArticleEntity.label)
+        .all()
+    )
+    dates = dict(
+        db.session.query(Title.title_index, Title.date)
+        .filter(Title.title_index.in_(title_indices))
+        .all()
+    )
+
+    db.session.add_all([
+        TitleEntity(
+            title_index=row.title_index,
+            entity=row.entity,
+            entity_key=row.entity_key,
+            label=row.label,
+            article_count=int(row.article_count),
+            mentions=int(row.mentions or 0),
+            date=dates.get(row.title_index),
+        )
+        for row in rows
+    ])
+    return len(rows)
@@ -0,0 +1,60 @@
+import pandas as pd
+from app.model import Article
+from app.utils.hashing import content_hash
+
+PROCESSED_COLUMNS = ('cleaned', 'embedding', 'bias', 'hoax', 'ideology')
+
+def find_processed(hashes):
+    hashes = {h for h in hashes if h}
+    if not hashes:
+        return {}
+
+    rows = Article.query.filter(
+        Article.content_hash.in_(hashes),
+        Article.embedding.isnot(None)
+    ).all()
+    return {row.content_hash: row for row in rows}
+
+def copy_processed(source, article):
+    for col in PROCESSED_COLUMNS:
+        setattr(article, col, getattr(source, col))
+    # Topik KMeans hanya bergantung pada embedding, jadi ikut disalin
+    article.cluster = source.cluster
+
+def _is_missing(value):
+    if isinstance(value, (list, tuple)):
+        return len(value) == 0
+    return value is None or value == '' or (isinstance(value, float) and pd.isnull(value))
+
+def attach_processed(df):
+    if df.empty or 'content' not in df.columns:
+        return df
+
+    for col in PROCESSED_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+        df[col] = df[col].astype(object)
+
+    df['content_hash'] = df['content'].map(content_hash)
+    processed = find_processed(df['content_hash'])
+    if not processed:
+        return df
+
+    # Isi hanya kolom yang kosong, nilai dari request tetap diutamakan
+    for idx, hash_value in df['content_hash'].items():
+        row = processed.get(hash_value)
+        if row is None:
+            continue
+
+        for col in PROCESSED_COLUMNS:
+            value = getattr(row, col)
+            if value is None or not _is_missing(df.at[idx, col]):
+                continue
+
+            if col == 'embedding':
+                value = value.tolist()
+            elif col in ('bias', 'hoax', 'ideology'):
+                value = float(value)
+            df.at[idx, col] = value
+
+    return df
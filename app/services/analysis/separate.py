@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
-import networkx as nx
 from app.utils.mainfunctions import dfEmbedding
-from sklearn.metrics.pairwise import cosine_similarity
+from app.utils.grouping import group_by_similarity
+from app.services.analysis.processed import attach_processed
 
 def separate_service(data, similarity_threshold=0.9):
 
@@ -16,32 +16,8 @@ def separate_service(data, similarity_threshold=0.9):
             raise ValueError(f"Input must contain {col} field")
     
 
+    df = attach_processed(df)
     df = dfEmbedding(df)
     embeddings = np.array(df['embedding'].to_list(), dtype=np.float32)
 
-
-    similarity_matrix = cosine_similarity(embeddings)
-
-
-    G = nx.Graph()
-    for i in range(len(similarity_matrix)):
-        for j in range(i + 1, len(similarity_matrix)):
-            if similarity_matrix[i, j] >= similarity_threshold:
-                G.add_edge(i, j)
- 
-    clusters = [list(component) for component in nx.connected_components(G)]
-    cluster_indices = [-1] * len(df)
-
-    current_cluster_index = 0
-    for cluster in clusters:
-        for idx in cluster:
-            cluster_indices[idx] = current_cluster_index
-        current_cluster_index += 1
-
-
-    for idx, cluster_index in enumerate(cluster_indices):
-        if cluster_index == -1:
-            cluster_indices[idx] = current_cluster_index
-            current_cluster_index += 1
-
-    return cluster_indices
+    return group_by_similarity(embeddings, similarity_threshold)
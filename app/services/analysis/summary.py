@@ -1,6 +1,7 @@
 import pandas as pd
 from app.utils.llm import create_documents, summarize_article
 from app.utils.mainfunctions import completeDf
+from app.services.analysis.processed import attach_processed
 
 def summarize_service(data):
 
@@ -12,6 +13,7 @@ def summarize_service(data):
         if col not in df.columns:
             raise ValueError(f"Input must contain {col} field")
 
+    df = attach_processed(df)
     df = completeDf(df)
 
     documents = create_documents(df)
@@ -1,6 +1,6 @@
 import pandas as pd
 from app.utils.llm import getTitle, create_documents
-from app.utils.mainfunctions import dfEmbedding
+from app.services.analysis.processed import attach_processed
 
 def generate_title_service(data):
 
@@ -12,7 +12,8 @@ def generate_title_service(data):
         if col not in df.columns:
             raise ValueError(f"Input must contain {col} field")
     
-    df = dfEmbedding(df)
-    
+    # Embedding hanya dibuat jika getQueryEngine jatuh ke mode index (lihat getSharedIndex)
+    df = attach_processed(df)
+
     documents = create_documents(df)
     return getTitle(documents)
@@ -0,0 +1,120 @@
+import os
+import time
+import sqlite3
+import threading
+
+# SQLite membatasi jumlah parameter per query
+SQLITE_MAX_VARIABLES = 900
+
+# Path cache relatif diukur dari root project (bukan working directory), supaya semua
+# worker memakai file yang sama dari mana pun proses dijalankan
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(PROJECT_ROOT, "cache"))
+
+def resolve_cache_path(path, default_name=None):
+    # None -> default di CACHE_DIR; string kosong -> cache nonaktif
+    if path is None:
+        return os.path.join(CACHE_DIR, default_name) if default_name else None
+    if not path:
+        return ''
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+class SqliteCache:
+    # Cache key -> blob di file SQLite dengan eviksi LRU berdasarkan waktu akses terakhir.
+    # ttl (detik) opsional: entri yang lebih tua dari ttl sejak ditulis dianggap tidak ada.
+    # File yang sama aman dipakai beberapa proses (WAL + busy timeout).
+
+    def __init__(self, path, table='cache', max_entries=100000, ttl=None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, last_access REAL NOT NULL, "
+            "created REAL NOT NULL DEFAULT 0)"
+        )
+        # Tabel dari versi sebelumnya belum punya kolom created
+        columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+        if 'created' not in columns:
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN created REAL NOT NULL DEFAULT 0")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)")
+
+    def get_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        min_created = now - self.ttl if self.ttl else None
+
+        with self._lock:
+            for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+                placeholders = ','.join('?' * len(chunk))
+                query = f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders})"
+                params = list(chunk)
+                if min_created is not None:
+                    query += " AND created >= ?"
+                    params.append(min_created)
+                found.update(self._conn.execute(query, params).fetchall())
+
+            if found:
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items):
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, last_access, created) VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()]
+            )
+            self._evict(now)
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def _evict(self, now):
+        if self.ttl:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl,))
+
+        size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+
+from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+from Sastrawi.Stemmer.Filter import TextNormalizer
+
+# Ukuran LRU stem per kata, dan path opsional untuk menyimpan cache antar run
+STEM_CACHE_SIZE = int(os.getenv("STEM_CACHE_SIZE", "200000"))
+STEM_CACHE_PATH = os.getenv("STEM_CACHE_PATH")
+
+# Jumlah worker proses dan ukuran chunk untuk pembersihan teks paralel
+CLEANING_WORKERS = int(os.getenv("CLEANING_WORKERS", "0")) or os.cpu_count() or 1
+CLEANING_CHUNK_SIZE = int(os.getenv("CLEANING_CHUNK_SIZE", "64"))
+
+
+class StemCache:
+    # LRU kata -> stem. Stemmer bawaan Sastrawi (CachedStemmer) menyimpan cache
+    # tanpa batas, jadi di sini dipakai stemmer dasarnya dengan cache terbatas.
+
+    def __init__(self, stem_word, maxsize=STEM_CACHE_SIZE, path=STEM_CACHE_PATH):
+        self._stem_word = stem_word
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.path:
+            self.load()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _put(self, word, stem):
+        self._cache[word] = stem
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def stem(self, word):
+        with self._lock:
+            if word in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(word)
+                return self._cache[word]
+
+        stem = self._stem_word(word)
+        with self._lock:
+            self.misses += 1
+            self._put(word, stem)
+        return stem
+
+    def stem_many(self, words):
+        # Hanya kata yang belum ada di cache yang di-stem
+        stems = {}
+        unseen = []
+        with self._lock:
+            for word in set(words):
+                if word in self._cache:
+                    self._cache.move_to_end(word)
+                    stems[word] = self._cache[word]
+                else:
+                    unseen.append(word)
+            self.hits += len(stems)
+            self.misses += len(unseen)
+
+        new_stems = {word: self._stem_word(word) for word in unseen}
+        with self._lock:
+            for word, stem in new_stems.items():
+                self._put(word, stem)
+
+        stems.update(new_stems)
+        return stems
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        with self._lock:
+            for word, stem in entries[-self.maxsize:]:
+                self._cache[word] = stem
+
+    def save(self):
+        if not self.path:
+            return
+
+        with self._lock:
+            entries = list(self._cache.items())
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+
+stopword = None
+stem_cache = None
+sastrawi_lock = threading.Lock()
+
+def initSastrawi(persist=True):
+    global stopword, stem_cache
+
+    # Objek Sastrawi dibuat sekali per proses (kamus stemmer cukup besar)
+    with sastrawi_lock:
+        if stem_cache is not None:
+            return
+
+        stopword_factory = StopWordRemoverFactory()
+        stopword = stopword_factory.create_stop_word_remover()
+        stemmer_factory = StemmerFactory()
+        stemmer = stemmer_factory.create_stemmer()
+        stem_cache = StemCache(stemmer.delegatedStemmer.stem_word)
+
+        if persist and STEM_CACHE_PATH:
+            atexit.register(stem_cache.save)
+
+def initCleaningWorker():
+    # Worker memuat cache dari disk tetapi tidak menulisnya kembali,
+    # supaya beberapa proses tidak menimpa file yang sama
+    initSastrawi(persist=False)
+
+def cleanText(text):
+    initSastrawi()
+    text = str(text)
+
+    # change text to lowercase
+    text = text.lower()
+
+    # change link with http/https patterns
+    text = re.sub(r'http\S+', '', text)
+
+    # remove hashtag and username
+    text = re.sub(r'(@\w+|#\w+)', '', text)
+
+    # remove character other than a-z and A-Z
+    text = re.sub(r'[^a-zA-Z\s]', ' ', text)
+
+    # replace new line '\n' with space
+    text = re.sub(r'\n', ' ', text)
+    text = re.sub(r'\t', ' ', text)
+
+    # remove stopword with sastrawi library
+    text = stopword.remove(text)
+
+    # tokenize dengan normalisasi yang sama seperti stemmer sastrawi
+    return TextNormalizer.normalize_text(text).split(' ')
+
+def joinStems(tokens, stems):
+    text = ' '.join(stems[token] for token in tokens)
+
+    # removing more than one space
+    return re.sub(r'\s{2,}', ' ', text)
+
+def preprocessText(text):
+    tokens = cleanText(text)
+
+    # do stemming with sastrawi library
+    stems = stem_cache.stem_many(tokens)
+
+    return joinStems(tokens, stems)
+
+def preprocess_many(texts):
+    initSastrawi()
+    token_lists = [cleanText(text) for text in texts]
+
+    # Stem setiap kata unik sekali untuk seluruh batch
+    stems = stem_cache.stem_many(token for tokens in token_lists for token in tokens)
+
+    return [joinStems(tokens, stems) for tokens in token_lists]
+
+cleaning_pool = None
+cleaning_pool_lock = threading.Lock()
+
+def getCleaningPool():
+    global cleaning_pool
+
+    # Satu pool per proses dengan CLEANING_WORKERS worker; jumlah worker per request
+    # diatur lewat jumlah chunk, bukan dengan membuat pool baru
+    with cleaning_pool_lock:
+        if cleaning_pool is None:
+            # spawn: proses baru tidak mewarisi thread TensorFlow/torch dari parent
+            cleaning_pool = ProcessPoolExecutor(
+                max_workers=CLEANING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initCleaningWorker,
+            )
+        return cleaning_pool
+
+def shutdownCleaningPools():
+    global cleaning_pool
+
+    with cleaning_pool_lock:
+        if cleaning_pool is not None:
+            cleaning_pool.shutdown(wait=False, cancel_futures=True)
+            cleaning_pool = None
+
+atexit.register(shutdownCleaningPools)
+
+def clean_parallel(texts, workers=None, chunk_size=None):
+    texts = list(texts)
+    # workers bisa berasal dari request, jadi dibatasi ke 1..CLEANING_WORKERS
+    workers = min(max(int(workers or CLEANING_WORKERS), 1), CLEANING_WORKERS)
+    chunk_size = chunk_size or CLEANING_CHUNK_SIZE
+
+    # Untuk input kecil overhead antar proses lebih mahal daripada pembersihannya
+    if workers <= 1 or len(texts) <= chunk_size:
+        return preprocess_many(texts)
+
+    # Request yang meminta worker lebih sedikit dibagi menjadi paling banyak `workers` chunk
+    if workers < CLEANING_WORKERS:
+        chunk_size = max(chunk_size, -(-len(texts) // workers))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    pool = getCleaningPool()
+
+    cleaned = []
+    for result in pool.map(preprocess_many, chunks):
+        cleaned.extend(result)
+    return cleaned
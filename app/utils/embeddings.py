@@ -0,0 +1,94 @@
+import os
+import threading
+
+import numpy as np
+from llama_index.core import Settings
+from llama_index.embeddings.openai import OpenAIEmbedding
+
+from app.utils.cache import SqliteCache, resolve_cache_path
+from app.utils.hashing import content_hash
+from app.utils.ratelimit import rate_limited
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+
+# Jumlah teks per request ke API embedding (OpenAI menerima hingga 2048 input)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+
+# Cache embedding berdasarkan model + hash konten; path kosong = cache nonaktif
+EMBEDDING_CACHE_PATH = resolve_cache_path(os.getenv("EMBEDDING_CACHE_PATH"), "embeddings.sqlite3")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "200000"))
+
+embedding_cache = None
+embedding_cache_lock = threading.Lock()
+
+def createEmbedModel(**kwargs):
+    # Retry ditangani rate_limited di embed_texts, retry bawaan client dimatikan
+    kwargs.setdefault('max_retries', 0)
+    return OpenAIEmbedding(model=EMBEDDING_MODEL, embed_batch_size=EMBEDDING_BATCH_SIZE, **kwargs)
+
+def getEmbeddingCache():
+    global embedding_cache
+
+    if not EMBEDDING_CACHE_PATH:
+        return None
+
+    with embedding_cache_lock:
+        if embedding_cache is None:
+            embedding_cache = SqliteCache(EMBEDDING_CACHE_PATH, table='embeddings', max_entries=EMBEDDING_CACHE_SIZE)
+        return embedding_cache
+
+def embeddingCacheKey(model_name, text):
+    return f"{model_name}:{content_hash(text)}"
+
+def hasEmbedding(value):
+    return isinstance(value, (list, np.ndarray))
+
+def embed_texts(texts, batch_size=EMBEDDING_BATCH_SIZE, embed_model=None):
+    embed_model = embed_model or Settings.embed_model
+    texts = [str(text) for text in texts]
+
+    cache = getEmbeddingCache()
+    model_name = getattr(embed_model, 'model_name', type(embed_model).__name__)
+    keys = [embeddingCacheKey(model_name, text) for text in texts]
+
+    embeddings = [None] * len(texts)
+    if cache is not None:
+        cached = cache.get_many(keys)
+        for pos, key in enumerate(keys):
+            if key in cached:
+                embeddings[pos] = np.frombuffer(cached[key], dtype=np.float32).tolist()
+
+    # Teks yang sama cukup di-embed sekali
+    missing = {}
+    for pos, key in enumerate(keys):
+        if embeddings[pos] is None:
+            missing.setdefault(key, []).append(pos)
+
+    missing_keys = list(missing)
+    new_embeddings = {}
+    for start in range(0, len(missing_keys), batch_size):
+        chunk = missing_keys[start:start + batch_size]
+        results = rate_limited(
+            'openai-embedding', embed_model.get_text_embedding_batch,
+            [texts[missing[key][0]] for key in chunk]
+        )
+        # Disamakan dengan hasil dari cache (float32), jadi nilai embedding tidak bergantung pada cache hit/miss
+        new_embeddings.update(
+            (key, np.asarray(embedding, dtype=np.float32).tolist()) for key, embedding in zip(chunk, results)
+        )
+
+    for key, embedding in new_embeddings.items():
+        for pos in missing[key]:
+            embeddings[pos] = embedding
+
+    if cache is not None and new_embeddings:
+        cache.put_many({
+            key: np.asarray(embedding, dtype=np.float32).tobytes()
+            for key, embedding in new_embeddings.items()
+        })
+
+    return embeddings
+
+def embedding_cache_stats():
+    cache = getEmbeddingCache()
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Jumlah baris per blok perkalian matriks (memori ~ block_size x n float32)
+GROUPING_BLOCK_SIZE = int(os.getenv("GROUPING_BLOCK_SIZE", "1024"))
+
+def normalize_rows(embeddings):
+    X = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return X / norms
+
+def similar_pairs(X, threshold, block_size=GROUPING_BLOCK_SIZE):
+    # Pasangan (i, j) dengan i < j dan cosine >= threshold, dihitung per blok
+    # segitiga atas sehingga matriks n x n tidak pernah dibuat utuh
+    rows, cols = [], []
+    for start in range(0, len(X), block_size):
+        block = X[start:start + block_size] @ X[start:].T
+        i, j = np.nonzero(block >= threshold)
+        i += start
+        j += start
+        upper = j > i
+        rows.append(i[upper])
+        cols.append(j[upper])
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+def label_components(n, rows, cols):
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    n_components, labels = connected_components(graph, directed=False)
+
+    # Urutan index: grup berisi >1 artikel dulu (urut index terkecil anggotanya),
+    # lalu artikel tunggal sesuai urutan input
+    sizes = np.bincount(labels, minlength=n_components)
+    first = np.full(n_components, n, dtype=np.int64)
+    np.minimum.at(first, labels, np.arange(n))
+
+    multi = np.flatnonzero(sizes > 1)
+    single = np.flatnonzero(sizes == 1)
+    multi = multi[np.argsort(first[multi], kind='stable')]
+    single = single[np.argsort(first[single], kind='stable')]
+
+    mapping = np.empty(n_components, dtype=np.int64)
+    mapping[multi] = np.arange(len(multi))
+    mapping[single] = np.arange(len(multi), len(multi) + len(single))
+    return mapping[labels].tolist()
+
+def group_by_similarity(embeddings, threshold=0.9, block_size=GROUPING_BLOCK_SIZE):
+    n = len(embeddings)
+    if n == 0:
+        return []
+
+    X = normalize_rows(embeddings)
+    rows, cols = similar_pairs(X, threshold, block_size)
+    return label_components(n, rows, cols)
+
+def group_centroids(embeddings, labels):
+    # Centroid per grup = rata-rata vektor ternormalisasi, lalu dinormalisasi lagi
+    X = normalize_rows(embeddings)
+    unique, inverse = np.unique(np.asarray(labels), return_inverse=True)
+    sums = np.zeros((len(unique), X.shape[1]), dtype=np.float32)
+    np.add.at(sums, inverse, X)
+    return unique, normalize_rows(sums)
+
+def assign_to_centroids(embeddings, centroids, threshold=0.9):
+    # Posisi centroid paling mirip untuk setiap vektor, atau -1 jika di bawah threshold
+    if len(embeddings) == 0 or len(centroids) == 0:
+        return np.full(len(embeddings), -1, dtype=np.int64)
+
+    similarities = normalize_rows(embeddings) @ np.asarray(centroids, dtype=np.float32).T
+    best = similarities.argmax(axis=1)
+    matched = similarities[np.arange(len(best)), best] >= threshold
+    return np.where(matched, best, -1)
@@ -0,0 +1,7 @@
+import hashlib
+
+def content_hash(text):
+    # Hash konten artikel untuk mendeteksi artikel yang sudah pernah diproses
+    if text is None:
+        return None
+    return hashlib.sha256(str(text).strip().encode('utf-8')).hexdigest()
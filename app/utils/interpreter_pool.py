@@ -0,0 +1,53 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import tensorflow as tf
+
+# Default: satu interpreter per core, masing-masing single-thread
+POOL_SIZE = int(os.getenv("INTERPRETER_POOL_SIZE", "0")) or os.cpu_count() or 1
+NUM_THREADS = int(os.getenv("INTERPRETER_NUM_THREADS", "1"))
+
+
+class InterpreterPool:
+    # tf.lite.Interpreter tidak aman dipanggil bersamaan dari beberapa thread,
+    # jadi setiap thread meminjam interpreter miliknya sendiri lewat checkout().
+
+    def __init__(self, model_path, size=POOL_SIZE, num_threads=NUM_THREADS):
+        self.model_path = model_path
+        self.size = max(1, size)
+        self.num_threads = num_threads
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        # Satu interpreter dibuat di awal supaya error model langsung terlihat
+        self._idle.put(self._create())
+
+    def _create(self):
+        interpreter = tf.lite.Interpreter(model_path=self.model_path, num_threads=self.num_threads)
+        interpreter.allocate_tensors()
+        self._created += 1
+        return interpreter
+
+    def _acquire(self, timeout):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Tambah interpreter baru selama pool belum penuh
+        with self._lock:
+            if self._created < self.size:
+                return self._create()
+
+        return self._idle.get(timeout=timeout)
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        interpreter = self._acquire(timeout)
+        try:
+            yield interpreter
+        finally:
+            self._idle.put(interpreter)
@@ -1,22 +1,249 @@
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from llama_index.core import Settings, Document, VectorStoreIndex, SummaryIndex
-from llama_index.embeddings.openai import OpenAIEmbedding
+from llama_index.core.base.response.schema import Response
 from llama_index.llms.openai import OpenAI
-Settings.llm = OpenAI(model='gpt-4o-mini')
-Settings.embed_model = OpenAIEmbedding(model="text-embedding-ada-002")
+from loguru import logger
+from app.utils.embeddings import createEmbedModel, embed_texts
+from app.utils.ratelimit import rate_limited
+from app.utils.packing import pack_documents
+from app.utils.hashing import content_hash
+from app.utils.cache import SqliteCache, resolve_cache_path
+from app.utils.registry import registry
 
-def getTitle(documents):
-    query_engine = VectorStoreIndex.from_documents(documents).as_query_engine(llm=Settings.llm)
-    titleQuery = """
+LLM_PROVIDER = 'openai'
+
+class RateLimitedOpenAI(OpenAI):
+    # Limiter dan retry dipasang per panggilan API, jadi query engine yang memanggil LLM
+    # beberapa kali (tree_summarize, refine) menghabiskan slot sesuai jumlah panggilannya.
+    # Retry bawaan client dimatikan (max_retries=0) supaya hanya ada satu lapis retry.
+
+    def chat(self, messages, **kwargs):
+        return rate_limited(LLM_PROVIDER, super().chat, messages, **kwargs)
+
+    def complete(self, prompt, formatted=False, **kwargs):
+        return rate_limited(LLM_PROVIDER, super().complete, prompt, formatted=formatted, **kwargs)
+
+def createLLM(**kwargs):
+    return RateLimitedOpenAI(model='gpt-4o-mini', max_retries=0, **kwargs)
+
+Settings.llm = createLLM()
+Settings.embed_model = createEmbedModel()
+
+# direct: semua artikel grup dikemas ke satu prompt (fallback ke index jika tidak muat)
+# index: selalu lewat retrieval VectorStoreIndex
+LLM_CONTEXT_MODE = os.getenv("LLM_CONTEXT_MODE", "direct")
+LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "24000"))
+LLM_MIN_DOC_TOKENS = int(os.getenv("LLM_MIN_DOC_TOKENS", "256"))
+LLM_INDEX_CACHE_SIZE = int(os.getenv("LLM_INDEX_CACHE_SIZE", "32"))
+
+# Title, summary, dan analysis dalam satu panggilan JSON; gagal -> kembali ke panggilan terpisah
+LLM_COMBINED_MODE = os.getenv("LLM_COMBINED_MODE", "true").lower() in ('1', 'true', 'yes')
+GROUP_CONTENT_FIELDS = ('title', 'summary', 'analysis')
+
+# Cache respons LLM per model + versi prompt + isi dokumen; path kosong = cache nonaktif
+LLM_CACHE_PATH = resolve_cache_path(os.getenv("LLM_CACHE_PATH"), "llm.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "20000"))
+
+# Naikkan jika makna prompt berubah tanpa mengubah teks template
+PROMPT_TEMPLATE_VERSION = 1
+
+DIRECT_PROMPT = """Context information is below.
+---------------------
+{context}
+---------------------
+Given the context information and not prior knowledge, answer the query.
+Query: {query}
+Answer: """
+
+TITLE_QUERY = """
     From the following articles, generate a single article title that summarizes the content of all articles.
     Be as factual, neutral, and objective as possible.
     Do not use prior knowledge.
     Include the important subjects in the title if there are any. 
     Use Indonesian language.
     """
-    response = query_engine.query(titleQuery)
-    return response.response
+
+SUMMARY_QUERY = """
+    Create a short, detailed, and factual summary of the articles.
+    Include important informations from the articles. 
+    Use the framework of a good paragraph that answers the what, when, who, where, which, and how inside the summary.
+    
+    metadata related to each article: 
+    likelihood to be read from a narrow point of view (0: not biased/neutral, 1: biased), 
+    likelihood of this article to be re-written into missleading hoaxes (0: is factual, 1: has more likely to be a hoax), 
+    and whether it's writing style ideology (a bit provocative like a liberal (the closer the value to 1) or trying to maintain what is already exist like a conservative (the closer the value to 0))
+
+    which are all detected using machine learning models are also included.
+    
+    Include both ideologies to the summary.
+    Do NOT discuss about the article's hoax, bias, or political view. 
+    Do NOT rely on previous knowledge.
+    Use Indonesian language. 
+    """
+
+COMPARE_QUERY = """
+    I have a collection of articles classified as either liberal or conservative. These articles all discuss the same event but from differing perspectives.
+    Your task is to analyze a given query and generate a response summarizing how articles from each perspective address the topic. 
+    
+    Ensure the response follows this structure:
+    Dari sisi Liberal: [Summarize key points using the language and tone of liberal articles (ideology value closer to 1). If no liberal perspective exists, return "there are no liberal perspectives."]
+    Dari sisi Konservatif: [Summarize key points using the language and tone of conservative articles (ideology value closer to 0). If no conservative perspective exists, return "there are no conservative perspectives."]
+    
+    Follow these guidelines:
+    Derive all information directly from the provided articles—do not rely on prior knowledge or external context.
+    Keep summaries concise, factual, and reflective of the language and tone used in the articles. Avoid being too wordy.
+    Highlight notable phrases or specific terminology unique to each perspective to showcase differences in framing or emphasis.
+    Only include sections for perspectives present in the articles. If only one perspective is available, summarize that side alone.
+    Format responses as concise paragraphs. Do not include editorial commentary, personal interpretation, or merge perspectives into one.
+    Use Indonesian language.
+    """
+
+CUAN_QUERY = """
+    Create a finance analysis with these information. The articles have also been classified as finance related. These are the results from the finance analysis model:
+    Last actual day: {last_actual_day}
+    Last actual opening price: {last_actual_opening_price}
+    Forecast date: {forecast_date}
+    First forecast opening price: {first_forecast_opening_price}
+    Difference between last actual day's price and first forecast date's price: {price_difference}
+    Percentage change of price: {percentage_change}
+    Final sentiment: {final_sentiment}
+    Final weight: {final_weight}
+
+    Ensure the response is concise and factual. Use Indonesian Language.
+    """
+
+COMBINED_PROMPT = """Context information is below.
+---------------------
+{context}
+---------------------
+Using only the context information and not prior knowledge, complete the three tasks below.
+Answer with a single JSON object with exactly these string fields: "title", "summary", "analysis".
+
+Task "title":
+{title_query}
+Task "summary":
+{summary_query}
+Task "analysis":
+{compare_query}
+"""
+
+class DirectQueryEngine:
+    # Pengganti query engine index: konteks sudah dikemas, satu panggilan LLM per query
+    def __init__(self, context):
+        self.context = context
+
+    def query(self, query):
+        prompt = DIRECT_PROMPT.format(context=self.context, query=query)
+        completion = Settings.llm.complete(prompt)
+        return Response(response=completion.text)
+
+shared_indexes = OrderedDict()
+shared_index_locks = {}
+shared_indexes_lock = threading.Lock()
+
+def documentsKey(documents):
+    # Hash urutan dokumen beserta metadata (title, bias, hoax, ideology)
+    payload = json.dumps(
+        [[document.text or '', document.metadata or {}] for document in documents],
+        sort_keys=True, default=str
+    )
+    return content_hash(payload)
+
+llm_cache = None
+llm_cache_lock = threading.Lock()
+
+def getLLMCache():
+    global llm_cache
+
+    if not LLM_CACHE_PATH:
+        return None
+
+    with llm_cache_lock:
+        if llm_cache is None:
+            llm_cache = SqliteCache(LLM_CACHE_PATH, table='responses', max_entries=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL or None)
+        return llm_cache
+
+def llmCacheKey(stage, template, documents, extra=None):
+    model = getattr(Settings.llm, 'model', type(Settings.llm).__name__)
+    parts = [
+        model, stage, LLM_CONTEXT_MODE,
+        f"v{PROMPT_TEMPLATE_VERSION}", content_hash(template)[:16],
+        documentsKey(documents),
+    ]
+    if extra is not None:
+        parts.append(content_hash(json.dumps(extra, sort_keys=True, default=str))[:16])
+    return ':'.join(parts)
+
+def cached_llm(stage, template, documents, generate, extra=None):
+    cache = getLLMCache()
+    if cache is None:
+        return generate()
+
+    key = llmCacheKey(stage, template, documents, extra)
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    result = generate()
+    cache.put(key, json.dumps(result).encode('utf-8'))
+    return result
+
+def llm_cache_stats():
+    cache = getLLMCache()
+    return cache.stats() if cache is not None else None
+
+def getSharedIndex(documents):
+    # Satu VectorStoreIndex per grup, dipakai bersama oleh title dan analysis
+    key = documentsKey(documents)
+    with shared_indexes_lock:
+        if key in shared_indexes:
+            shared_indexes.move_to_end(key)
+            return shared_indexes[key]
+        build_lock = shared_index_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with shared_indexes_lock:
+            if key in shared_indexes:
+                return shared_indexes[key]
+
+        # Embedding dokumen hanya dibutuhkan di mode index; yang belum ada di-embed sekaligus (ter-cache)
+        missing = [document for document in documents if document.embedding is None]
+        if missing:
+            for document, embedding in zip(missing, embed_texts([document.text for document in missing])):
+                document.embedding = embedding
+
+        registry.get('nltk')
+        index = VectorStoreIndex.from_documents(documents)
+
+        with shared_indexes_lock:
+            shared_indexes[key] = index
+            shared_index_locks.pop(key, None)
+            while len(shared_indexes) > LLM_INDEX_CACHE_SIZE:
+                shared_indexes.popitem(last=False)
+        return index
+
+def getQueryEngine(documents):
+    if LLM_CONTEXT_MODE == 'direct':
+        context = pack_documents(documents, LLM_CONTEXT_TOKENS, LLM_MIN_DOC_TOKENS)
+        if context is not None:
+            return DirectQueryEngine(context)
+
+    return getSharedIndex(documents).as_query_engine(llm=Settings.llm)
+
+def getTitle(documents):
+    def generate():
+        query_engine = getQueryEngine(documents)
+        response = query_engine.query(TITLE_QUERY)
+        return response.response
+
+    return cached_llm('title', TITLE_QUERY, documents, generate)
 
 def create_documents(df):
     documents = []
@@ -55,73 +282,28 @@ def create_documents(df):
 def create_summary(documents):
     if(documents == []):
         return "No articles written in this perspective."
-    
-    summarizeQuery = """
-    Create a short, detailed, and factual summary of the articles.
-    Include important informations from the articles. 
-    Use the framework of a good paragraph that answers the what, when, who, where, which, and how inside the summary.
-    
-    metadata related to each article: 
-    likelihood to be read from a narrow point of view (0: not biased/neutral, 1: biased), 
-    likelihood of this article to be re-written into missleading hoaxes (0: is factual, 1: has more likely to be a hoax), 
-    and whether it's writing style ideology (a bit provocative like a liberal (the closer the value to 1) or trying to maintain what is already exist like a conservative (the closer the value to 0))
 
-    which are all detected using machine learning models are also included.
-    
-    Include both ideologies to the summary.
-    Do NOT discuss about the article's hoax, bias, or political view. 
-    Do NOT rely on previous knowledge.
-    Use Indonesian language. 
-    """
+    def generate():
+        registry.get('nltk')
+        summary_index = SummaryIndex.from_documents(documents)
+        summary_query_engine = summary_index.as_query_engine(llm=Settings.llm, response_mode='tree_summarize')
+        summary = summary_query_engine.query(SUMMARY_QUERY)
+        return summary.response
 
-    summary_index = SummaryIndex.from_documents(documents)
-    summary_query_engine = summary_index.as_query_engine(llm=Settings.llm, response_mode='tree_summarize')
-    summary = summary_query_engine.query(summarizeQuery)
-    return summary.response
+    return cached_llm('summary', SUMMARY_QUERY, documents, generate)
+
+def create_cuan_analysis(query_engine, cuan_result):
+    response = query_engine.query(CUAN_QUERY.format(**cuan_result))
+    return response.response
 
 def create_analysis(query_engine, cuan_result):
-    compareQuery = """
-    I have a collection of articles classified as either liberal or conservative. These articles all discuss the same event but from differing perspectives.
-    Your task is to analyze a given query and generate a response summarizing how articles from each perspective address the topic. 
-    
-    Ensure the response follows this structure:
-    Dari sisi Liberal: [Summarize key points using the language and tone of liberal articles (ideology value closer to 1). If no liberal perspective exists, return "there are no liberal perspectives."]
-    Dari sisi Konservatif: [Summarize key points using the language and tone of conservative articles (ideology value closer to 0). If no conservative perspective exists, return "there are no conservative perspectives."]
-    
-    Follow these guidelines:
-    Derive all information directly from the provided articles—do not rely on prior knowledge or external context.
-    Keep summaries concise, factual, and reflective of the language and tone used in the articles. Avoid being too wordy.
-    Highlight notable phrases or specific terminology unique to each perspective to showcase differences in framing or emphasis.
-    Only include sections for perspectives present in the articles. If only one perspective is available, summarize that side alone.
-    Format responses as concise paragraphs. Do not include editorial commentary, personal interpretation, or merge perspectives into one.
-    Use Indonesian language.
-    """
-    
-    cuanQuery = ""
-    if cuan_result is not None:
-        cuanQuery = """
-        Create a finance analysis with these information. The articles have also been classified as finance related. These are the results from the finance analysis model:
-        Last actual day: {last_actual_day}
-        Last actual opening price: {last_actual_opening_price}
-        Forecast date: {forecast_date}
-        First forecast opening price: {first_forecast_opening_price}
-        Difference between last actual day's price and first forecast date's price: {price_difference}
-        Percentage change of price: {percentage_change}
-        Final sentiment: {final_sentiment}
-        Final weight: {final_weight}
-
-        Ensure the response is concise and factual. Use Indonesian Language.
-        """.format(**cuan_result)
-
-    response = query_engine.query(compareQuery)
-
-    # Initialize cuanResponse with an empty string to avoid errors
+    response = query_engine.query(COMPARE_QUERY)
+
     cuanResponse = ""
-    if cuanQuery:
-        cuanResponse = query_engine.query(cuanQuery)
-        cuanResponse = cuanResponse.response
+    if cuan_result is not None:
+        cuanResponse = create_cuan_analysis(query_engine, cuan_result)
 
-    return response.response + cuanResponse  # Avoid accessing response2 if it's not set
+    return response.response + cuanResponse
 
 def summarize_article(documents):
     all_docs = [document for document in documents]
@@ -130,8 +312,57 @@ def summarize_article(documents):
     return all_summary
     
 def analyze_article(documents, cuan_result=None):
-    query_engine = VectorStoreIndex.from_documents(documents).as_query_engine(llm=Settings.llm)
+    def generate():
+        query_engine = getQueryEngine(documents)
+        return create_analysis(query_engine, cuan_result)
+
+    analysis = cached_llm('analysis', COMPARE_QUERY + CUAN_QUERY, documents, generate, extra=cuan_result)
+
+    return analysis
+
+def parse_group_content(text):
+    # Validasi skema: objek JSON dengan field title/summary/analysis berupa string tidak kosong
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Combined response is not a JSON object")
+
+    content = {}
+    for field in GROUP_CONTENT_FIELDS:
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Combined response has no valid '{field}' field")
+        content[field] = value.strip()
+    return content
+
+def create_group_content(context):
+    prompt = COMBINED_PROMPT.format(
+        context=context,
+        title_query=TITLE_QUERY,
+        summary_query=SUMMARY_QUERY,
+        compare_query=COMPARE_QUERY,
+    )
+    kwargs = {}
+    if isinstance(Settings.llm, OpenAI):
+        kwargs['response_format'] = {"type": "json_object"}
+
+    completion = Settings.llm.complete(prompt, **kwargs)
+    return parse_group_content(completion.text)
 
-    analysis = create_analysis(query_engine, cuan_result)
+def generate_group_content(documents):
+    if LLM_COMBINED_MODE and documents:
+        context = pack_documents(documents, LLM_CONTEXT_TOKENS, LLM_MIN_DOC_TOKENS)
+        if context is not None:
+            try:
+                return cached_llm(
+                    'combined', COMBINED_PROMPT + TITLE_QUERY + SUMMARY_QUERY + COMPARE_QUERY,
+                    documents, lambda: create_group_content(context)
+                )
+            except Exception as e:
+                logger.warning(f"Combined generation failed, falling back to split calls: {str(e)}")
 
-    return analysis
\ No newline at end of file
+    return {
+        'title': getTitle(documents),
+        'summary': summarize_article(documents),
+        'analysis': analyze_article(documents),
+    }
\ No newline at end of file
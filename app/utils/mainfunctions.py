@@ -1,40 +1,51 @@
 import os
 import sys
-import re
+import json
 import pickle
+import hashlib
 
 import numpy as np
 import pandas as pd
-import swifter
-import tensorflow as tf
-from keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras import preprocessing
 from sklearn.metrics.pairwise import cosine_similarity
 
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-
 from llama_index.core import Settings
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.llms.openai import OpenAI
+
+from app.utils.registry import registry
+from app.utils.cleaning import preprocessText, preprocess_many, clean_parallel
+from app.utils.embeddings import createEmbedModel, hasEmbedding, embed_texts, EMBEDDING_BATCH_SIZE
+from app.utils.llm import createLLM
 
 # Configure Llama Index settings
-Settings.llm = OpenAI(model='gpt-4o-mini')
-Settings.embed_model = OpenAIEmbedding(model="text-embedding-ada-002")
+Settings.llm = createLLM()
+Settings.embed_model = createEmbedModel()
+
+# Jumlah artikel per invoke TFLite pada inferensi batch
+INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", "256"))
+
+# Tokenizer dengan konfigurasi identik dipakai bersama supaya teks cukup di-tokenize sekali
+shared_tokenizers = {}
 
-# Fix TensorFlow preprocessing module reference
-sys.modules['keras.src.preprocessing'] = preprocessing
+def shareTokenizer(tokenizer):
+    config = json.dumps(tokenizer.get_config(), sort_keys=True)
+    key = hashlib.sha1(config.encode('utf-8')).hexdigest()
+    return shared_tokenizers.setdefault(key, tokenizer)
 
 def loadModel(model_path, model_name):
+    # TensorFlow baru di-import saat model pertama kali dimuat
+    from tensorflow.keras import preprocessing
+    from app.utils.interpreter_pool import InterpreterPool
+
+    # Fix TensorFlow preprocessing module reference
+    sys.modules['keras.src.preprocessing'] = preprocessing
+
     script_dir = os.path.dirname(os.path.abspath(__file__))  
     abs_model_path = os.path.join(script_dir, model_path)  
 
     with open(os.path.join(abs_model_path, f"{model_name}_tokenizer.pkl"), 'rb') as f:
-        tokenizer = pickle.load(f)
+        tokenizer = shareTokenizer(pickle.load(f))
 
-    interpreter = tf.lite.Interpreter(model_path=os.path.join(abs_model_path, f"{model_name}.tflite"))
-    interpreter.allocate_tensors()
-    return tokenizer, interpreter
+    interpreter_pool = InterpreterPool(os.path.join(abs_model_path, f"{model_name}.tflite"))
+    return tokenizer, interpreter_pool
 
 def loadClusterModel():
     script_dir = os.path.dirname(os.path.abspath(__file__)) 
@@ -44,111 +55,149 @@ def loadClusterModel():
         kmeans = pickle.load(f)
     return kmeans
 
-# Load models
-kmeans = loadClusterModel()
-bias_tokenizer, bias_interpreter = loadModel("../model/bias", "bias")
-hoax_tokenizer, hoax_interpreter = loadModel("../model/hoax", "hoax")
-ideology_tokenizer, ideology_interpreter = loadModel("../model/ideology", "ideology")
-
-stopword_factory = StopWordRemoverFactory()
-stopword = stopword_factory.create_stop_word_remover()
-stemmer_factory = StemmerFactory()
-stemmer = stemmer_factory.create_stemmer()
-
-def preprocessText(text):
-    text = str(text)
+CLASSIFIER_COLUMNS = ('bias', 'hoax', 'ideology')
+CLASSIFIER_MAXLEN = {'bias': 30, 'hoax': 100, 'ideology': 100}
 
-    # change text to lowercase
-    text = text.lower()
+def warmupClusterModel(kmeans):
+    kmeans.predict(np.zeros((1, kmeans.n_features_in_), dtype=np.float32))
 
-    # change link with http/https patterns
-    text = re.sub(r'http\S+', '', text)
+def warmupClassifier(name):
+    def warmup(model):
+        tokenizer, pool = model
+        predictWithModel("warmup", tokenizer, pool, CLASSIFIER_MAXLEN[name])
+    return warmup
 
-    # remove hashtag and username
-    text = re.sub(r'(@\w+|#\w+)', '', text)
+# Model dimuat saat pertama dipakai lewat registry; KMeans dan TFLite aman dimuat sebelum fork
+registry.register('kmeans', loadClusterModel, warmup=warmupClusterModel, fork_safe=True)
+for name in CLASSIFIER_COLUMNS:
+    registry.register(name, lambda name=name: loadModel(f"../model/{name}", name), warmup=warmupClassifier(name), fork_safe=True)
 
-    # remove character other than a-z and A-Z
-    text = re.sub(r'[^a-zA-Z\s]', ' ', text)
+def getClusterModel():
+    return registry.get('kmeans')
 
-    # replace new line '\n' with space
-    text = re.sub(r'\n', ' ', text)
-    text = re.sub(r'\t', ' ', text)
+def getClassifier(name):
+    tokenizer, pool = registry.get(name)
+    return tokenizer, pool, CLASSIFIER_MAXLEN[name]
 
-    # remove stopword with sastrawi library
-    text = stopword.remove(text)
+def padTexts(texts, tokenizer, maxLen):
+    from keras.preprocessing.sequence import pad_sequences
 
-    # do stemming with sastrawi library
-    text = stemmer.stem(text)
-
-    # removing more than one space
-    text = re.sub(r'\s{2,}', ' ', text)
-
-    return text
-
-def predictWithModel(newsText, tokenizer, interpreter, maxLen):
-    new_sequences = tokenizer.texts_to_sequences([newsText])
-    new_padded = pad_sequences(new_sequences, maxlen=maxLen, padding='post', truncating='post')
-    new_padded = new_padded.astype('float32')
+    sequences = tokenizer.texts_to_sequences(list(texts))
+    padded = pad_sequences(sequences, maxlen=maxLen, padding='post', truncating='post')
+    return padded.astype('float32')
 
+def runInterpreter(interpreter, padded):
     input_details = interpreter.get_input_details()
     output_details = interpreter.get_output_details()
 
-    interpreter.set_tensor(input_details[0]['index'], new_padded)
+    # Resize input tensor ke ukuran batch hanya jika shape berubah (allocate_tensors mahal)
+    if tuple(input_details[0]['shape']) != padded.shape:
+        interpreter.resize_tensor_input(input_details[0]['index'], padded.shape)
+        interpreter.allocate_tensors()
+
+    interpreter.set_tensor(input_details[0]['index'], padded)
     interpreter.invoke()
 
-    predictions = interpreter.get_tensor(output_details[0]['index'])
-    return predictions
+    return interpreter.get_tensor(output_details[0]['index'])
+
+def predictWithModel(newsText, tokenizer, pool, maxLen):
+    new_padded = padTexts([newsText], tokenizer, maxLen)
+    with pool.checkout() as interpreter:
+        return runInterpreter(interpreter, new_padded)
 
 def predictBias(newsText):    
-    predictions = predictWithModel(newsText, bias_tokenizer, bias_interpreter, 30)
+    predictions = predictWithModel(newsText, *getClassifier('bias'))
     return float(predictions[0])
 
 def predictHoax(newsText):
-    predictions = predictWithModel(newsText, hoax_tokenizer, hoax_interpreter, 100)
+    predictions = predictWithModel(newsText, *getClassifier('hoax'))
     return float(predictions[0])
 
 def predictIdeology(newsText):
-    predictions =  predictWithModel(newsText, ideology_tokenizer, ideology_interpreter, 100)
+    predictions =  predictWithModel(newsText, *getClassifier('ideology'))
     return float(predictions[0])
 
-def dfEmbedding(df):
-    df['embedding'] = df.apply(
-            lambda row: row['embedding'] if isinstance(row.get('embedding'), (list, np.ndarray)) else Settings.embed_model.get_text_embedding(row['content']), 
-            axis=1
-    )
+def classifyBatch(texts, columns=CLASSIFIER_COLUMNS, batch_size=INFERENCE_BATCH_SIZE):
+    texts = [str(text) for text in texts]
+    results = {col: np.empty(len(texts), dtype=np.float32) for col in columns}
+
+    # Kelompokkan model per tokenizer; padding 'post' ke maxLen terbesar lalu
+    # dipotong per model memberi hasil yang sama dengan padding terpisah
+    groups = {}
+    for col in columns:
+        tokenizer, pool, maxLen = getClassifier(col)
+        groups.setdefault(id(tokenizer), (tokenizer, []))[1].append((col, pool, maxLen))
+
+    # Satu slice teks dipakai bergantian oleh bias, hoax, dan ideology
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        for tokenizer, heads in groups.values():
+            padded = padTexts(batch, tokenizer, max(maxLen for _, _, maxLen in heads))
+            for col, pool, maxLen in heads:
+                with pool.checkout() as interpreter:
+                    output = runInterpreter(interpreter, np.ascontiguousarray(padded[:, :maxLen]))
+                results[col][start:start + len(batch)] = output.reshape(len(batch), -1)[:, 0]
+    return results
+
+def classify_all(texts, batch_size=INFERENCE_BATCH_SIZE):
+    if isinstance(texts, str):
+        texts = [texts]
+
+    # Preprocessing sekali, lalu ketiga model memakai teks bersih yang sama
+    cleaned = clean_parallel(texts)
+    scores = classifyBatch(cleaned, batch_size=batch_size)
+
+    return [
+        {
+            'cleaned': cleaned[i],
+            'bias': float(scores['bias'][i]),
+            'hoax': float(scores['hoax'][i]),
+            'ideology': float(scores['ideology'][i]),
+        }
+        for i in range(len(cleaned))
+    ]
+
+def dfEmbedding(df, batch_size=EMBEDDING_BATCH_SIZE):
+    if 'embedding' not in df.columns:
+        df['embedding'] = None
+    df['embedding'] = df['embedding'].astype(object)
+
+    # Kumpulkan semua baris tanpa embedding lalu kirim per batch, hasil ditulis balik per posisi
+    missing = [pos for pos, value in enumerate(df['embedding']) if not hasEmbedding(value)]
+    if missing:
+        contents = df['content'].tolist()
+        embeddings = embed_texts([contents[pos] for pos in missing], batch_size=batch_size)
+
+        col = df.columns.get_loc('embedding')
+        for pos, embedding in zip(missing, embeddings):
+            df.iat[pos, col] = embedding
     return df
 
-def completeDf(df):
+def completeDf(df, batch_size=INFERENCE_BATCH_SIZE):
     for col in ['bias', 'hoax', 'ideology', 'embedding', 'cleaned']:
         if col not in df.columns:
             df[col] = None
 
     mask = df['cleaned'].isnull() | (df['cleaned'] == '')
 
-    df.loc[mask, 'cleaned'] = df.loc[mask, 'content'].swifter.apply(preprocessText)
+    if mask.any():
+        df.loc[mask, 'cleaned'] = clean_parallel(df.loc[mask, 'content'].tolist())
 
     df = dfEmbedding(df)
 
-    df['bias'] = df.swifter.apply(
-        lambda row: row['bias'] if pd.notnull(row['bias']) else predictBias([row['cleaned']]),
-        axis=1
-    )
-
-    df['hoax'] = df.swifter.apply(
-        lambda row: row['hoax'] if pd.notnull(row['hoax']) else predictHoax([row['cleaned']]),
-        axis=1
-    )
-
-    df['ideology'] = df.swifter.apply(
-        lambda row: row['ideology'] if pd.notnull(row['ideology']) else predictIdeology([row['cleaned']]),
-        axis=1
-    )
+    # Baris yang belum punya skor diklasifikasi dalam satu batch oleh ketiga model
+    missing = df[list(CLASSIFIER_COLUMNS)].isnull().any(axis=1)
+    if missing.any():
+        predictions = classifyBatch(df.loc[missing, 'cleaned'].tolist(), batch_size=batch_size)
+        for col in CLASSIFIER_COLUMNS:
+            scores = pd.Series(predictions[col].astype(float), index=df.index[missing])
+            df[col] = df[col].astype(object).where(df[col].notnull(), scores)
 
     return df
 
 def getClusters(df):
     X = np.array(df['embedding'].to_list(), dtype=np.float32)
-    clusters = kmeans.predict(X)
+    clusters = getClusterModel().predict(X)
     modeCluster = np.bincount(clusters).argmax()
     return int(modeCluster)
 
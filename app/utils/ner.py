@@ -1,26 +1,100 @@
 import os
-from simpletransformers.ner import NERModel, NERArgs
+import re
+from app.utils.registry import registry
+
+LABELS = ['O', 'B-PER', 'I-PER', 'B-LOC', 'I-LOC', 'B-ORG', 'I-ORG']
+
+NER_MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "model", "ner"))
+
+# torch: NERModel simpletransformers, onnx: model ONNX int8 (app/utils/ner_onnx.py)
+NER_BACKEND = os.getenv("NER_BACKEND", "torch")
+
+# Jumlah potongan teks per forward pass dan jumlah thread torch (0 = default torch)
+NER_EVAL_BATCH_SIZE = int(os.getenv("NER_EVAL_BATCH_SIZE", "32"))
+NER_TORCH_THREADS = int(os.getenv("NER_TORCH_THREADS", "0"))
+
+# Artikel panjang dipotong per kalimat menjadi potongan maksimal sekian kata
+# supaya token tidak terpotong oleh max_seq_length DistilBERT (128)
+NER_CHUNK_WORDS = int(os.getenv("NER_CHUNK_WORDS", "64"))
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
 
 def setup_environment():
     os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 
 def get_model(labels):
-    script_dir = os.path.dirname(os.path.abspath(__file__))  # Get the current script's directory
-    model_path = os.path.join(script_dir, "..", "model", "ner")  # Construct absolute model path
-    model_path = os.path.abspath(model_path)
+    # simpletransformers (torch) hanya di-import saat model NER dimuat
+    import torch
+    from simpletransformers.ner import NERModel, NERArgs
+
+    if NER_TORCH_THREADS > 0:
+        torch.set_num_threads(NER_TORCH_THREADS)
+
+    model_path = NER_MODEL_DIR
 
     model_args = NERArgs()
     model_args.labels_list = labels
     model_args.do_lower_case = True
+    model_args.eval_batch_size = NER_EVAL_BATCH_SIZE
+    model_args.use_multiprocessing_for_evaluation = False
+    model_args.silent = True
 
     return NERModel(model_type='distilbert', model_name=model_path, labels=labels, args=model_args, use_cuda=False)
 
+def load_ner_model(backend=None):
+    if (backend or NER_BACKEND) == 'onnx':
+        from app.utils.ner_onnx import OnnxNERModel
+        return OnnxNERModel()
+
+    setup_environment()
+    return get_model(LABELS)
+
+def warmup_ner_model(model):
+    model.predict(["Presiden Joko Widodo berkunjung ke Jakarta."])
+
+registry.register('ner', load_ner_model, warmup=warmup_ner_model)
+
+def chunk_text(text, max_words=NER_CHUNK_WORDS):
+    # Gabungkan kalimat berurutan sampai max_words; kalimat yang terlalu panjang dipecah per kata
+    chunks = []
+    current = []
+    for sentence in SENTENCE_SPLIT.split(str(text).strip()):
+        words = sentence.split()
+        while len(words) > max_words:
+            if current:
+                chunks.append(current)
+                current = []
+            chunks.append(words[:max_words])
+            words = words[max_words:]
+
+        if current and len(current) + len(words) > max_words:
+            chunks.append(current)
+            current = []
+        current.extend(words)
+
+    if current:
+        chunks.append(current)
+    return [' '.join(chunk) for chunk in chunks]
+
 def predict_text(model, text):
     if not isinstance(text, list):
         text = [text]
-    predictions, raw_outputs = model.predict(text)
+
+    # Semua potongan dari semua teks diprediksi dalam satu panggilan (dibatch per eval_batch_size)
+    chunks = []
+    owners = []
+    for i, item in enumerate(text):
+        for chunk in chunk_text(item):
+            chunks.append(chunk)
+            owners.append(i)
+
+    predictions = [[] for _ in text]
+    if chunks:
+        chunk_predictions, raw_outputs = model.predict(chunks)
+        for owner, prediction in zip(owners, chunk_predictions):
+            predictions[owner].extend(prediction)
     return predictions
- 
+
 def filter_predictions(labels, predictions):
     filtered_predictions = [
     [{word: tag} for token in sentence for word, tag in token.items() if tag in labels and tag != 'O']
@@ -28,10 +102,31 @@ def filter_predictions(labels, predictions):
     ]
     return filtered_predictions
 
+def group_entities(prediction):
+    # Gabungkan token B-/I- berurutan menjadi entitas utuh, mis. "Joko Widodo" (PER)
+    entities = []
+    words, label = [], None
+    for token in prediction:
+        for word, tag in token.items():
+            word = word.strip('.,;:!?()[]"\'')
+            if tag.startswith('I-') and label == tag[2:] and word:
+                words.append(word)
+                continue
+
+            if words:
+                entities.append((' '.join(words), label))
+            words, label = ([word], tag[2:]) if tag != 'O' and word else ([], None)
+
+    if words:
+        entities.append((' '.join(words), label))
+    return entities
+
+def extract_entities(texts):
+    model = registry.get('ner')
+    return [group_entities(prediction) for prediction in predict_text(model, list(texts))]
+
 def main(text):
-    setup_environment()
-    labels = ['O', 'B-PER', 'I-PER', 'B-LOC', 'I-LOC', 'B-ORG', 'I-ORG']
-    model = get_model(labels)
+    model = registry.get('ner')
     predictions = predict_text(model, text)
-    filtered_predictions = filter_predictions(labels, predictions)
-    return filtered_predictions
\ No newline at end of file
+    filtered_predictions = filter_predictions(LABELS, predictions)
+    return filtered_predictions
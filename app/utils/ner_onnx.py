@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+
+from app.utils.ner import LABELS, NER_EVAL_BATCH_SIZE, NER_MODEL_DIR
+
+# Model hasil export (lihat `flask ner export-onnx`) dan jumlah thread onnxruntime (0 = default)
+NER_ONNX_PATH = os.getenv("NER_ONNX_PATH", os.path.join(NER_MODEL_DIR, "onnx", "model.quant.onnx"))
+NER_ONNX_THREADS = int(os.getenv("NER_ONNX_THREADS", "0"))
+NER_MAX_SEQ_LENGTH = int(os.getenv("NER_MAX_SEQ_LENGTH", "128"))
+
+
+def export_onnx(model_dir=NER_MODEL_DIR, output_dir=None, quantize=True, opset=14):
+    # Export DistilBERT token classification ke ONNX lalu kuantisasi dinamis int8 (bobot Linear/MatMul)
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    output_dir = output_dir or os.path.dirname(NER_ONNX_PATH)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, do_lower_case=True)
+    model = AutoModelForTokenClassification.from_pretrained(model_dir)
+    model.config.return_dict = False
+    model.eval()
+
+    sample = tokenizer(["Presiden berkunjung ke Jakarta"], return_tensors='pt')
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in ('input_ids', 'attention_mask', 'logits')}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample['input_ids'], sample['attention_mask']),
+            fp32_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(output_dir)
+
+    if not quantize:
+        return fp32_path
+
+    quant_path = os.path.join(output_dir, "model.quant.onnx")
+    quantize_dynamic(fp32_path, quant_path, weight_type=QuantType.QInt8)
+    return quant_path
+
+
+class OnnxNERModel:
+    # Pengganti NERModel simpletransformers untuk inferensi CPU: predict() mengembalikan
+    # format yang sama ([{kata: label}, ...] per teks), jadi filter_predictions tetap dipakai
+
+    def __init__(self, model_path=NER_ONNX_PATH, labels=LABELS, batch_size=NER_EVAL_BATCH_SIZE,
+                 max_seq_length=NER_MAX_SEQ_LENGTH, num_threads=NER_ONNX_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path), do_lower_case=True)
+        self.labels = list(labels)
+        self.batch_size = max(1, batch_size)
+        self.max_seq_length = max_seq_length
+
+    def _predict_batch(self, word_lists):
+        encoded = self.tokenizer(
+            word_lists,
+            is_split_into_words=True,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors='np',
+        )
+        inputs = {
+            name: encoded[name].astype(np.int64)
+            for name in ('input_ids', 'attention_mask')
+            if name in self.input_names
+        }
+        logits = self.session.run(None, inputs)[0]
+        label_ids = logits.argmax(axis=-1)
+
+        results = []
+        for row, words in enumerate(word_lists):
+            # Label kata diambil dari subword pertamanya; kata yang terpotong max_seq_length -> 'O'
+            tags = ['O'] * len(words)
+            seen = set()
+            for position, word_id in enumerate(encoded.word_ids(row)):
+                if word_id is None or word_id in seen:
+                    continue
+                seen.add(word_id)
+                tags[word_id] = self.labels[label_ids[row, position]]
+            results.append(([{word: tag} for word, tag in zip(words, tags)], logits[row]))
+        return results
+
+    def predict(self, texts):
+        word_lists = [str(text).split() for text in texts]
+        predictions = [[] for _ in texts]
+        raw_outputs = [None for _ in texts]
+
+        # Urutkan per panjang supaya padding dalam satu batch minimal
+        order = sorted((i for i, words in enumerate(word_lists) if words), key=lambda i: len(word_lists[i]))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, (prediction, raw) in zip(batch, self._predict_batch([word_lists[i] for i in batch])):
+                predictions[i] = prediction
+                raw_outputs[i] = raw
+
+        return predictions, raw_outputs
@@ -0,0 +1,135 @@
+import os
+import re
+import threading
+
+import tiktoken
+from loguru import logger
+
+LLM_TOKENIZER_MODEL = os.getenv("LLM_TOKENIZER_MODEL", "gpt-4o-mini")
+
+# Sisipan di akhir artikel yang dipotong karena melebihi jatah token
+TRUNCATION_MARK = " [...]"
+
+# Artikel yang melebihi jatahnya dipecah per paragraf/kalimat menjadi potongan maksimal
+# sekian token; yang disimpan adalah potongan utuh dari awal artikel (lead berita)
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "200"))
+
+PARAGRAPH_SPLIT = re.compile(r'\n\s*\n|\n')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+
+class CharTokenizer:
+    # Perkiraan kasar (~4 karakter per token) jika encoding tiktoken tidak bisa dimuat
+
+    chars_per_token = 4
+
+    def encode(self, text):
+        step = self.chars_per_token
+        return [text[i:i + step] for i in range(0, len(text), step)]
+
+    def decode(self, tokens):
+        return ''.join(tokens)
+
+
+tokenizer = None
+tokenizer_lock = threading.Lock()
+
+def getTokenizer():
+    global tokenizer
+
+    with tokenizer_lock:
+        if tokenizer is None:
+            try:
+                tokenizer = tiktoken.encoding_for_model(LLM_TOKENIZER_MODEL)
+            except Exception as e:
+                logger.warning(f"tiktoken encoding unavailable ({str(e)}), estimating tokens from characters")
+                tokenizer = CharTokenizer()
+        return tokenizer
+
+def count_tokens(text):
+    return len(getTokenizer().encode(text))
+
+def truncate_tokens(text, max_tokens):
+    tokens = getTokenizer().encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return getTokenizer().decode(tokens[:max_tokens]).rstrip() + TRUNCATION_MARK
+
+def split_chunks(text, max_tokens=LLM_CHUNK_TOKENS):
+    # Paragraf pendek digabung sampai max_tokens, paragraf panjang dipecah per kalimat
+    chunks = []
+    current, current_tokens = [], 0
+    for paragraph in PARAGRAPH_SPLIT.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        pieces = [paragraph] if count_tokens(paragraph) <= max_tokens else SENTENCE_SPLIT.split(paragraph)
+        for piece in pieces:
+            tokens = count_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(' '.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+def fit_text(text, max_tokens):
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    # Potongan utuh dari awal artikel selama muat, supaya teks tidak terputus di tengah kalimat
+    kept = []
+    used = count_tokens(TRUNCATION_MARK)
+    for chunk in split_chunks(text, min(LLM_CHUNK_TOKENS, max_tokens - used - 1)):
+        tokens = count_tokens(chunk) + 1
+        if used + tokens > max_tokens:
+            break
+        kept.append(chunk)
+        used += tokens
+
+    # Potongan pertama pun tidak muat: potong per token
+    if not kept:
+        return truncate_tokens(text, max_tokens)
+    return '\n'.join(kept) + TRUNCATION_MARK
+
+def allocate_budget(lengths, budget):
+    # Bagi rata sisa budget; artikel pendek memakai seperlunya, sisanya untuk artikel panjang
+    allocation = [0] * len(lengths)
+    remaining = budget
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    for position, i in enumerate(order):
+        share = remaining // (len(order) - position)
+        allocation[i] = min(lengths[i], share)
+        remaining -= allocation[i]
+    return allocation
+
+def format_header(position, document):
+    metadata = dict(document.metadata or {})
+    title = metadata.pop('title', '')
+    lines = [f"[Article {position + 1}] {title}".rstrip()]
+    if metadata:
+        lines.append(', '.join(f"{key}: {value}" for key, value in metadata.items()))
+    return '\n'.join(lines) + '\n'
+
+def pack_documents(documents, budget, min_doc_tokens=0):
+    # Gabungkan semua artikel grup ke satu konteks di bawah budget token.
+    # None jika tiap artikel tidak kebagian minimal min_doc_tokens (butuh retrieval).
+    if not documents:
+        return ''
+
+    headers = [format_header(i, document) for i, document in enumerate(documents)]
+    texts = [document.text or '' for document in documents]
+
+    available = budget - sum(count_tokens(header) for header in headers)
+    if available < min_doc_tokens * len(documents):
+        return None
+
+    allocation = allocate_budget([count_tokens(text) for text in texts], available)
+    return '\n\n'.join(
+        header + fit_text(text, tokens)
+        for header, text, tokens in zip(headers, texts, allocation)
+    )
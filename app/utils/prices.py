@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+from datetime import date
+
+import pandas as pd
+from loguru import logger
+
+from app.utils.cache import resolve_cache_path
+
+# Riwayat harga disimpan per (symbol, tanggal); kosongkan PRICE_STORE_PATH untuk selalu unduh langsung
+PRICE_STORE_PATH = resolve_cache_path(os.getenv("PRICE_STORE_PATH"), "prices.sqlite3")
+
+# Sumber data: yahoo (yfinance) atau csv (file lokal, mis. fixture untuk test/benchmark)
+PRICE_SOURCE = os.getenv("PRICE_SOURCE", "yahoo")
+PRICE_CSV_PATH = os.getenv("PRICE_CSV_PATH", "")
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def to_date_string(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+def normalize_prices(df):
+    # Samakan format semua sumber: index tanggal bernama Date, kolom PRICE_COLUMNS
+    if df is None or df.empty:
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+
+    if isinstance(df.columns, pd.MultiIndex):
+        # yfinance >= 0.2.48 mengembalikan kolom (Price, Ticker)
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+
+    df = df[[column for column in PRICE_COLUMNS if column in df.columns]]
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.index).tz_localize(None).normalize(), name='Date')
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+class PriceSource:
+    # fetch(symbol, start, end) -> DataFrame harga harian, start inklusif dan end eksklusif (seperti yfinance)
+
+    name = 'base'
+
+    def fetch(self, symbol, start, end):
+        raise NotImplementedError
+
+
+class YahooPriceSource(PriceSource):
+    name = 'yahoo'
+
+    def fetch(self, symbol, start, end):
+        import yfinance as yf
+
+        df = yf.download(symbol, start=start, end=end, progress=False)
+        return normalize_prices(df)
+
+
+class CsvPriceSource(PriceSource):
+    # CSV dengan kolom Date, Open, High, Low, Close, Volume dan opsional Symbol
+    name = 'csv'
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+
+    def load(self):
+        if self._data is None:
+            self._data = pd.read_csv(self.path, parse_dates=['Date'])
+        return self._data
+
+    def fetch(self, symbol, start, end):
+        df = self.load()
+        if 'Symbol' in df.columns:
+            df = df[df['Symbol'] == symbol]
+        df = df[(df['Date'] >= pd.Timestamp(start)) & (df['Date'] < pd.Timestamp(end))]
+        return normalize_prices(df.set_index('Date'))
+
+
+def create_price_source(name=None, csv_path=None):
+    name = name or PRICE_SOURCE
+    if name == 'yahoo':
+        return YahooPriceSource()
+    if name == 'csv':
+        return CsvPriceSource(csv_path or PRICE_CSV_PATH)
+    raise ValueError(f"Unknown price source '{name}'")
+
+
+class PriceStore:
+    # Riwayat harga harian di SQLite. Per symbol dicatat rentang yang sudah diunduh (coverage),
+    # sehingga permintaan berikutnya hanya mengunduh bagian yang belum ada. Hari ini ke atas
+    # tidak dianggap tercakup karena harganya belum final.
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            "source TEXT NOT NULL, symbol TEXT NOT NULL, date TEXT NOT NULL, "
+            "open REAL, high REAL, low REAL, close REAL, volume REAL, "
+            "PRIMARY KEY (source, symbol, date))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS price_coverage ("
+            "source TEXT NOT NULL, symbol TEXT NOT NULL, start_date TEXT NOT NULL, end_date TEXT NOT NULL, "
+            "PRIMARY KEY (source, symbol))"
+        )
+
+    def coverage(self, symbol):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT start_date, end_date FROM price_coverage WHERE source = ? AND symbol = ?",
+                (self.source.name, symbol)
+            ).fetchone()
+
+    def missing_ranges(self, symbol, start, end):
+        covered = self.coverage(symbol)
+        if covered is None:
+            return [(start, end)]
+
+        # Coverage dijaga tetap satu rentang: celah di antara ikut diunduh
+        covered_start, covered_end = covered
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            ranges.append((covered_end, end))
+        return ranges
+
+    def _save(self, symbol, df, start, end):
+        rows = [
+            (self.source.name, symbol, to_date_string(day),
+             *(None if pd.isna(row.get(column)) else float(row.get(column)) for column in PRICE_COLUMNS))
+            for day, row in df.iterrows()
+        ]
+        covered_end = min(end, date.today().isoformat())
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO prices (source, symbol, date, open, high, low, close, volume) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                if start < covered_end:
+                    self._conn.execute(
+                        "INSERT INTO price_coverage (source, symbol, start_date, end_date) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (source, symbol) DO UPDATE SET "
+                        "start_date = min(start_date, excluded.start_date), end_date = max(end_date, excluded.end_date)",
+                        (self.source.name, symbol, start, covered_end)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def read(self, symbol, start, end):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, open, high, low, close, volume FROM prices "
+                "WHERE source = ? AND symbol = ? AND date >= ? AND date < ? ORDER BY date",
+                (self.source.name, symbol, start, end)
+            ).fetchall()
+
+        df = pd.DataFrame(rows, columns=['Date'] + PRICE_COLUMNS)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop('Date')), name='Date')
+        return df
+
+    def get_history(self, symbol, start, end):
+        start, end = to_date_string(start), to_date_string(end)
+
+        with self._fetch_lock:
+            for fetch_start, fetch_end in self.missing_ranges(symbol, start, end):
+                try:
+                    df = self.source.fetch(symbol, fetch_start, fetch_end)
+                    self.fetches += 1
+                except Exception as e:
+                    # Sumber lambat/gagal: pakai data yang sudah tersimpan (jika ada)
+                    logger.warning(f"Fetching {symbol} {fetch_start}..{fetch_end} from {self.source.name} failed: {str(e)}")
+                    continue
+                self._save(symbol, df, fetch_start, fetch_end)
+
+        df = self.read(symbol, start, end)
+        if df.empty:
+            raise ValueError(f"No price data for {symbol} between {start} and {end}")
+        return df
+
+
+price_store = None
+price_store_lock = threading.Lock()
+
+def get_price_store():
+    global price_store
+
+    with price_store_lock:
+        if price_store is None:
+            price_store = PriceStore(PRICE_STORE_PATH, create_price_source())
+        return price_store
+
+def get_price_history(symbol, start, end):
+    if not PRICE_STORE_PATH:
+        return create_price_source().fetch(symbol, to_date_string(start), to_date_string(end))
+    return get_price_store().get_history(symbol, start, end)
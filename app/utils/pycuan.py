@@ -6,13 +6,13 @@ import unicodedata
 from googletrans import Translator
 import contractions
 import pandas as pd
-from keras.models import load_model
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+from Sastrawi.Stemmer.Filter import TextNormalizer
 import os
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-import yfinance as yf
+from app.utils.registry import registry
+from app.utils import cleaning
+from app.utils.prices import get_price_history
 
 def loadnltk():
     # Ensure NLTK loads from the correct path without modifying working directory
@@ -29,12 +29,38 @@ def load_models():
             return file_path
         raise FileNotFoundError(f"{filename} not found in {base_path}")
 
+    # Keras baru di-import saat model pycuan dimuat
+    from keras.models import load_model
+
     rf_classifier = joblib.load(find_file("random_forest_model.joblib"))
     tfidf_vectorizer = joblib.load(find_file("tfidf_vectorizer.joblib"))
     model = load_model(find_file("time_series_model.h5"))
 
     return tfidf_vectorizer, rf_classifier, model
 
+def compile_forecast_step(model, seq_length=30):
+    # Satu langkah forecast sebagai graph tf.function dengan shape tetap (sekali trace),
+    # jauh lebih cepat daripada model.predict atau pemanggilan eager per langkah
+    import tensorflow as tf
+
+    @tf.function(input_signature=[tf.TensorSpec((1, seq_length, 1), tf.float32)])
+    def forecast_step(x):
+        return model(x, training=False)
+
+    return forecast_step
+
+def load_engine():
+    tfidf_vectorizer, rf_classifier, model = load_models()
+    return tfidf_vectorizer, rf_classifier, compile_forecast_step(model)
+
+def warmup_engine(engine):
+    tfidf_vectorizer, rf_classifier, forecast_step = engine
+    rf_classifier.predict_proba(tfidf_vectorizer.transform(["warmup"]))
+    forecast_stock_prices(forecast_step, np.zeros((30, 1), dtype=np.float32), forecast_days=1)
+
+# Model pycuan dimuat sekali per proses lewat registry
+registry.register('pycuan', load_engine, warmup=warmup_engine)
+
 # Fungsi-fungsi pra-pemrosesan teks
 def strip_html_tags(text):
     # Fungsi ini menghapus tag HTML dari teks menggunakan BeautifulSoup
@@ -51,16 +77,17 @@ def remove_accented_chars(text):
 
 # Fungsi pra-pemrosesan teks khusus Bahasa Indonesia
 def preprocess_text_sastrawi(text):
-    # Fungsi ini menggunakan Sastrawi untuk menghapus stop word dan melakukan stemming pada teks Bahasa Indonesia
-    factory1 = StopWordRemoverFactory()
-    stopword_sastrawi = factory1.create_stop_word_remover()
-
-    factory2 = StemmerFactory()
-    stemmer_sastrawi = factory2.create_stemmer()
+    # Fungsi ini menggunakan Sastrawi untuk menghapus stop word dan melakukan stemming pada teks Bahasa Indonesia.
+    # Stopword remover dan cache stem dipakai bersama dengan app.utils.cleaning (dibuat sekali per proses)
+    cleaning.initSastrawi()
 
+    registry.get('nltk')
     tokens = nltk.word_tokenize(text)
-    tokens = [stopword_sastrawi.remove(token) for token in tokens]
-    tokens = [stemmer_sastrawi.stem(token) for token in tokens if token != '']
+    tokens = [cleaning.stopword.remove(token) for token in tokens]
+    tokens = [
+        " ".join(cleaning.stem_cache.stem(word) for word in TextNormalizer.normalize_text(token).split(' '))
+        for token in tokens if token != ''
+    ]
     return " ".join(tokens)
 
 def pre_process_text(text, language):
@@ -90,8 +117,8 @@ def sentiment_analysis(text, tfidf_vectorizer, rf_classifier, language='indonesi
     return sentiment_probability
 
 def get_stock_data(stock_symbol, start_date, end_date):
-    df = yf.download(stock_symbol, start=start_date, end=end_date)
-    return df
+    # Dilayani dari price store lokal; hanya rentang yang belum tersimpan yang diunduh
+    return get_price_history(stock_symbol, start_date, end_date)
 
 def normalize_data(data):
     scaler = StandardScaler()
@@ -109,14 +136,15 @@ def predict_time_series(model, X_data):
     predictions = model.predict(X_data)
     return predictions
 
-def forecast_stock_prices(model, normalized_data, forecast_days=5, seq_length=30):
-    X_forecast = np.copy(normalized_data[-seq_length:])
+def forecast_stock_prices(forecast_step, normalized_data, forecast_days=5, seq_length=30):
+    # forecast_step: hasil compile_forecast_step (atau model Keras yang bisa dipanggil langsung)
+    X_forecast = np.asarray(normalized_data[-seq_length:], dtype=np.float32).reshape(1, seq_length, 1)
     forecasted_values = []
     for _ in range(forecast_days):
-        forecasted_value = model.predict(X_forecast.reshape(1, seq_length, 1))
-        forecasted_values.append(forecasted_value[0, 0])
-        X_forecast = np.roll(X_forecast, -1)
-        X_forecast[-1] = forecasted_value
+        forecasted_value = float(np.asarray(forecast_step(X_forecast))[0, 0])
+        forecasted_values.append(forecasted_value)
+        X_forecast = np.roll(X_forecast, -1, axis=1)
+        X_forecast[0, -1, 0] = forecasted_value
     return forecasted_values
 
 def calculate_percentage_change(last_actual_price, forecasted_price):
@@ -131,7 +159,7 @@ def combine_weights(sentiment_probability, time_series_weight, sentiment_ratio=0
 
 def main(new_text, stock_symbol, start_date, end_date):
 
-    tfidf_vectorizer, rf_classifier, model = load_models()
+    tfidf_vectorizer, rf_classifier, forecast_step = registry.get('pycuan')
     sentiment_probability = sentiment_analysis(new_text, tfidf_vectorizer, rf_classifier)
     
     stock_data = get_stock_data(stock_symbol, start_date, end_date)
@@ -139,7 +167,7 @@ def main(new_text, stock_symbol, start_date, end_date):
     last_actual_opening_price = stock_data['Open'].iloc[-1].item()
     
     normalized_data = normalize_data(stock_data['Open'].values)
-    forecasted_values = forecast_stock_prices(model, normalized_data)
+    forecasted_values = forecast_stock_prices(forecast_step, normalized_data)
     first_forecast_opening_price = forecasted_values[0]
     
     forecast_days = 5
@@ -0,0 +1,106 @@
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+import openai
+from loguru import logger
+
+# Default untuk semua provider, bisa di-override per provider, mis. RATE_LIMIT_OPENAI_RPM
+RATE_LIMIT_RPM = int(os.getenv("RATE_LIMIT_RPM", "500"))
+RATE_LIMIT_CONCURRENCY = int(os.getenv("RATE_LIMIT_CONCURRENCY", "8"))
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "1.0"))
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "30.0"))
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    # Membatasi request per menit (jarak antar request) dan jumlah request bersamaan
+
+    def __init__(self, rpm=0, max_concurrent=0):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._semaphore = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+    @contextmanager
+    def limit(self):
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        try:
+            self.wait()
+            yield
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+def _provider_setting(provider, name, default):
+    key = f"RATE_LIMIT_{provider.upper().replace('-', '_')}_{name}"
+    return int(os.getenv(key, default))
+
+def get_rate_limiter(provider):
+    with rate_limiters_lock:
+        if provider not in rate_limiters:
+            rate_limiters[provider] = RateLimiter(
+                rpm=_provider_setting(provider, "RPM", RATE_LIMIT_RPM),
+                max_concurrent=_provider_setting(provider, "CONCURRENCY", RATE_LIMIT_CONCURRENCY),
+            )
+        return rate_limiters[provider]
+
+def is_retryable(error):
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return getattr(error, 'status_code', None) in RETRYABLE_STATUS
+
+def retry_delay(error, attempt):
+    # Hormati header Retry-After jika provider mengirimkannya
+    response = getattr(error, 'response', None)
+    retry_after = getattr(response, 'headers', {}).get('retry-after') if response is not None else None
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), RETRY_BACKOFF_MAX)
+    except ValueError:
+        pass
+
+    delay = min(RETRY_BACKOFF_BASE * (2 ** attempt), RETRY_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+def rate_limited(provider, func, *args, **kwargs):
+    limiter = get_rate_limiter(provider)
+
+    for attempt in range(RETRY_MAX_ATTEMPTS):
+        try:
+            with limiter.limit():
+                return func(*args, **kwargs)
+        except Exception as e:
+            if attempt + 1 >= RETRY_MAX_ATTEMPTS or not is_retryable(e):
+                raise
+            delay = retry_delay(e, attempt)
+            logger.warning(f"{provider} request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
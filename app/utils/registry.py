@@ -0,0 +1,96 @@
+import time
+import threading
+
+from loguru import logger
+
+
+class ModelRegistry:
+    # Model dimuat saat pertama dipakai (get) atau saat warmup eksplisit, sekali per proses.
+    # Loader didaftarkan oleh modul pemiliknya tanpa meng-import dependensi beratnya.
+    # fork_safe menandai model yang aman dimuat di master gunicorn sebelum fork
+    # (KMeans, TFLite); TF/Keras dan torch tidak aman dan harus dimuat per worker.
+
+    def __init__(self):
+        self._loaders = {}
+        self._warmups = {}
+        self._models = {}
+        self._locks = {}
+        self._fork_safe = set()
+        self._lock = threading.Lock()
+        self.errors = {}
+        self.ready = False
+
+    def register(self, name, loader, warmup=None, fork_safe=False):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            if warmup is not None:
+                self._warmups[name] = warmup
+            if fork_safe:
+                self._fork_safe.add(name)
+            else:
+                self._fork_safe.discard(name)
+
+    def get(self, name):
+        if name in self._models:
+            return self._models[name]
+
+        if name not in self._loaders:
+            raise KeyError(f"Model '{name}' is not registered")
+
+        with self._locks[name]:
+            if name not in self._models:
+                start = time.perf_counter()
+                self._models[name] = self._loaders[name]()
+                logger.info(f"Loaded model '{name}' in {time.perf_counter() - start:.2f}s")
+        return self._models[name]
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def names(self):
+        return list(self._loaders)
+
+    def fork_safe_names(self):
+        return [name for name in self._loaders if name in self._fork_safe]
+
+    def loaded(self):
+        return list(self._models)
+
+    def load(self, names=None):
+        # Muat tanpa inferensi, mis. di master gunicorn sebelum fork (memori dibagi copy-on-write)
+        for name in self.names() if names is None else names:
+            try:
+                self.get(name)
+            except Exception as e:
+                self.errors[name] = str(e)
+                logger.exception(f"Failed to load model '{name}': {str(e)}")
+
+    def warmup(self, names=None):
+        # Muat model lalu jalankan satu inferensi dummy (jika ada) supaya request pertama tidak lambat.
+        # Model yang gagal dicatat di errors dan proses tetap berjalan (akan dicoba lagi saat dipakai).
+        for name in self.names() if names is None else names:
+            try:
+                model = self.get(name)
+                if name in self._warmups:
+                    start = time.perf_counter()
+                    self._warmups[name](model)
+                    logger.info(f"Warmed up model '{name}' in {time.perf_counter() - start:.2f}s")
+                self.errors.pop(name, None)
+            except Exception as e:
+                self.errors[name] = str(e)
+                logger.exception(f"Failed to warm up model '{name}': {str(e)}")
+
+        self.ready = not self.errors
+        return self.ready
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "registered": self.names(),
+            "loaded": self.loaded(),
+            "errors": dict(self.errors),
+        }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,42 @@
+import os
+import json
+
+import numpy as np
+
+# Tipe penyimpanan embedding di database: float32 (default) atau float16
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")
+
+# Byte pertama blob menandai tipe data; JSON lama selalu diawali '['
+DTYPE_TAGS = {
+    'float32': b'\x01',
+    'float16': b'\x02',
+}
+TAG_DTYPES = {tag: np.dtype(name) for name, tag in DTYPE_TAGS.items()}
+
+def pack_vector(vector, dtype=EMBEDDING_DTYPE):
+    if vector is None:
+        return None
+    if isinstance(vector, str):
+        vector = json.loads(vector)
+    return DTYPE_TAGS[dtype] + np.asarray(vector, dtype=dtype).tobytes()
+
+def is_legacy_json(blob):
+    return isinstance(blob, str) or bytes(blob[:1]) == b'['
+
+def unpack_vector(blob):
+    if blob is None:
+        return None
+    if is_legacy_json(blob):
+        if isinstance(blob, (bytes, bytearray, memoryview)):
+            blob = bytes(blob).decode('utf-8')
+        return np.asarray(json.loads(blob), dtype=np.float32)
+
+    blob = bytes(blob)
+    return np.frombuffer(blob, dtype=TAG_DTYPES[blob[:1]], offset=1).astype(np.float32)
+
+def stack_vectors(vectors):
+    # Gabungkan beberapa embedding (array / blob / list) menjadi satu matriks float32
+    rows = [unpack_vector(v) if isinstance(v, (bytes, bytearray, memoryview, str)) else v for v in vectors]
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.vstack(rows).astype(np.float32, copy=False)
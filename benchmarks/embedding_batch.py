@@ -0,0 +1,88 @@
+# Benchmark embedding per baris vs batch terhadap server embedding stub lokal.
+#
+#   python -m benchmarks.embedding_batch --articles 500 --latency 0.05
+#
+# Server stub meniru endpoint POST /v1/embeddings OpenAI dengan latensi tetap
+# per request, sehingga yang diukur adalah jumlah round trip, bukan model.
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils import embeddings
+from app.utils.embeddings import createEmbedModel, embed_texts
+
+DIMENSIONS = 1536
+
+
+def make_handler(latency):
+    class StubEmbeddingHandler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            inputs = body['input'] if isinstance(body['input'], list) else [body['input']]
+            time.sleep(latency)
+            StubEmbeddingHandler.requests_served += 1
+
+            payload = json.dumps({
+                "object": "list",
+                "model": body.get("model"),
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [float(len(text) % 7)] * DIMENSIONS}
+                    for i, text in enumerate(inputs)
+                ],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            }).encode('utf-8')
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return StubEmbeddingHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help="detik per request")
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    # Yang diukur round trip ke API, jadi cache embedding dimatikan
+    embeddings.EMBEDDING_CACHE_PATH = ""
+
+    handler = make_handler(args.latency)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    embed_model = createEmbedModel(api_base=f"http://127.0.0.1:{server.server_port}/v1", api_key="stub")
+    texts = [f"Isi artikel berita nomor {i} tentang kebijakan pemerintah." for i in range(args.articles)]
+
+    start = time.perf_counter()
+    per_row = [embed_model.get_text_embedding(text) for text in texts]
+    per_row_time = time.perf_counter() - start
+    per_row_requests = handler.requests_served
+
+    handler.requests_served = 0
+    start = time.perf_counter()
+    batched = embed_texts(texts, batch_size=args.batch_size, embed_model=embed_model)
+    batched_time = time.perf_counter() - start
+
+    server.shutdown()
+
+    assert per_row == batched, "batch embedding harus sama dengan embedding per baris"
+    print(f"articles={args.articles} latency={args.latency}s batch_size={args.batch_size}")
+    print(f"per-row : {per_row_time:8.2f}s  requests={per_row_requests}")
+    print(f"batched : {batched_time:8.2f}s  requests={handler.requests_served}")
+    print(f"speedup : {per_row_time / batched_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Benchmark throughput NER: simpletransformers (torch) vs ONNX int8 (onnxruntime).
+#
+#   python -m benchmarks.ner_backends --texts 200 --repeat 3
+#
+# Model ONNX harus di-export dulu dengan `flask --app run ner export-onnx`.
+import argparse
+import time
+
+from app.utils.ner import load_ner_model, predict_text
+
+SENTENCES = [
+    "Presiden Joko Widodo meresmikan jalan tol baru di Jawa Tengah pada Senin pagi.",
+    "Komisi Pemberantasan Korupsi memeriksa mantan pejabat Kementerian Keuangan di Jakarta.",
+    "Bank Indonesia menahan suku bunga acuan, kata Gubernur Perry Warjiyo.",
+    "Warga Surabaya memadati Taman Bungkul untuk merayakan malam tahun baru.",
+    "Menteri Luar Negeri Retno Marsudi bertemu delegasi ASEAN di Bali.",
+]
+
+
+def make_texts(count, sentences_per_text=8):
+    return [
+        ' '.join(SENTENCES[(i + j) % len(SENTENCES)] for j in range(sentences_per_text))
+        for i in range(count)
+    ]
+
+
+def run(backend, texts, repeat):
+    start = time.perf_counter()
+    model = load_ner_model(backend)
+    load_time = time.perf_counter() - start
+
+    predict_text(model, texts[:2])  # warmup
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict_text(model, texts)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"{backend:>6}: load {load_time:6.2f}s | best {best:6.2f}s | {len(texts) / best:8.1f} texts/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--texts', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx'])
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    for backend in args.backends:
+        try:
+            run(backend, texts, args.repeat)
+        except Exception as e:
+            print(f"{backend:>6}: skipped ({type(e).__name__}: {e})")
+
+
+if __name__ == '__main__':
+    main()
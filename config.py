@@ -7,3 +7,22 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
+
+    # Blueprint yang didaftarkan: all, news, ml, atau ingest (lihat app.BLUEPRINTS)
+    APP_PROFILE = os.getenv("APP_PROFILE", "all")
+
+    # /crawlers/group: artikel baru digabung ke grup yang sudah ada jika mirip dengan centroid-nya
+    GROUP_ASSIGN_THRESHOLD = float(os.getenv("GROUP_ASSIGN_THRESHOLD", "0.9"))
+    GROUP_WINDOW_DAYS = int(os.getenv("GROUP_WINDOW_DAYS", "2"))
+
+    # /crawlers/process: jumlah panggilan LLM (title/summary/analysis) yang berjalan bersamaan
+    PROCESS_MAX_WORKERS = int(os.getenv("PROCESS_MAX_WORKERS", "8"))
+
+    # /crawlers/entities: jumlah artikel per run dan per batch NER (commit per batch)
+    ENTITY_JOB_LIMIT = int(os.getenv("ENTITY_JOB_LIMIT", "500"))
+    ENTITY_JOB_BATCH_SIZE = int(os.getenv("ENTITY_JOB_BATCH_SIZE", "64"))
+
+    # /process-all: saham/kripto untuk analisis cuan (cluster finansial) dan rentang datanya
+    PYCUAN_STOCK_SYMBOL = os.getenv("PYCUAN_STOCK_SYMBOL", "FTT-USD")
+    PYCUAN_START_DATE = os.getenv("PYCUAN_START_DATE", "2022-11-14")
+    PYCUAN_END_DATE = os.getenv("PYCUAN_END_DATE", "2023-11-14")
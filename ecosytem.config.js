@@ -4,8 +4,8 @@ module.exports = {
       name: "talas-be",
       cwd: "/home/ubuntu/TALAS-BE",
 
-      script: "/home/ubuntu/TALAS-BE/.venv/bin/python3",
-      args: "run.py",
+      script: "/home/ubuntu/TALAS-BE/.venv/bin/gunicorn",
+      args: "-c gunicorn.conf.py",
       interpreter: "none",
 
       watch: false,
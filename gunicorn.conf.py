@@ -0,0 +1,42 @@
+# Konfigurasi gunicorn untuk produksi: gunicorn -c gunicorn.conf.py
+# Entry point mengikuti profil, mis. WSGI_APP=wsgi.news:app untuk API baca saja.
+import os
+
+wsgi_app = os.getenv("WSGI_APP", "run:app")
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# /crawlers/process dan endpoint LLM bisa berjalan lama
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "600"))
+graceful_timeout = 30
+
+# App (dan model yang fork-safe, lihat when_ready) dimuat sekali di master lalu di-fork
+# ke worker, sehingga memori model dibagi copy-on-write
+preload_app = True
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "true").lower() in ('1', 'true', 'yes')
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    if not PRELOAD_MODELS:
+        return
+
+    # Hanya model fork-safe (KMeans, TFLite); TF/Keras dan torch yang dimuat sebelum fork
+    # membuat inferensi pertama di worker menggantung, jadi dimuat saat warmup per worker
+    from app.utils.registry import registry
+    names = registry.fork_safe_names()
+    server.log.info(f"Preloading models: {', '.join(names) or '-'}")
+    registry.load(names)
+
+
+def post_worker_init(worker):
+    # Satu inferensi dummy per model sebelum worker menerima request;
+    # /health/ready baru 200 setelah ini selesai
+    from app.utils.registry import registry
+    registry.warmup()
+    worker.log.info(f"Worker {worker.pid} warmup done: {registry.status()}")
@@ -3,8 +3,9 @@ import pytest
 from app import create_app, db
 from app.model import Title, Article
 from datetime import date
+from config import Config
 
-class TestConfig:
+class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
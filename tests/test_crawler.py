@@ -0,0 +1,79 @@
+import app.routes.crawler.route as crawler_route
+from app import db
+from app.model import Article
+
+
+def fake_classify_all(texts):
+    if any('rusak' in text for text in texts):
+        raise ValueError("cannot classify")
+    return [{'cleaned': text, 'bias': 0.1, 'hoax': 0.0, 'ideology': 0.2} for text in texts]
+
+
+def fake_embed_texts(texts, **kwargs):
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_update_skips_only_failing_article(client, monkeypatch):
+    monkeypatch.setattr(crawler_route, 'classify_all', fake_classify_all)
+    monkeypatch.setattr(crawler_route, 'embed_texts', fake_embed_texts)
+    monkeypatch.setattr(crawler_route, 'predict_clusters', lambda embeddings: [3 for _ in embeddings])
+
+    for i, article in enumerate(Article.query.order_by(Article.id).all()):
+        article.content = "teks rusak" if i == 0 else f"isi berita {i}"
+    db.session.commit()
+
+    response = client.get("/crawlers/update")
+    assert response.status_code == 200
+
+    articles = Article.query.order_by(Article.id).all()
+    assert articles[0].embedding is None
+    assert all(article.embedding is not None and article.cluster == 3 for article in articles[1:])
+
+
+def test_group_window_skips_stale_unprocessed_groups(client):
+    from datetime import date, timedelta
+    from app.model import Title
+    from app.routes.crawler.route import _assign_to_existing_groups
+
+    old_day = (date.today() - timedelta(days=30)).isoformat()
+    db.session.add_all([
+        Title(title_index=2, title="Lama", date=None),
+        Title(title_index=3, title="Baru", date=None),
+        Article(title="lama", date=old_day, title_index=2, embedding=[1.0, 0.0]),
+        Article(title="baru", date=date.today().isoformat(), title_index=3, embedding=[0.0, 1.0]),
+    ])
+    db.session.commit()
+
+    stale = Article(title="mirip lama", embedding=[1.0, 0.0])
+    fresh = Article(title="mirip baru", embedding=[0.0, 1.0])
+    assert _assign_to_existing_groups([stale, fresh], threshold=0.9, window_days=2) == 1
+    assert stale.title_index is None
+    assert fresh.title_index == 3
+
+
+def test_process_embeds_articles_without_embedding(client, monkeypatch):
+    from app.model import Title
+
+    captured = []
+
+    def fake_content(articles):
+        captured.extend(articles)
+        return {'title': "Judul", 'summary': "Ringkasan", 'analysis': "Analisis"}
+
+    monkeypatch.setattr(crawler_route, 'embed_texts', fake_embed_texts)
+    monkeypatch.setattr(crawler_route, 'predict_clusters', lambda embeddings: [2 for _ in embeddings])
+    monkeypatch.setattr(crawler_route, '_group_content_tasks', lambda: {'content': fake_content})
+
+    db.session.add_all([
+        Title(title_index=5, title=None),
+        Article(title="ada", content="sudah ada embedding", title_index=5, embedding=[0.5, 0.5]),
+        Article(title="belum", content="belum ada embedding", title_index=5),
+    ])
+    db.session.commit()
+
+    response = client.get("/crawlers/process")
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()["processed_groups"] == 1
+
+    assert all(isinstance(article['embedding'], list) for article in captured)
+    assert Title.query.filter_by(title_index=5).one().title == "Judul"
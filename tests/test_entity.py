@@ -0,0 +1,49 @@
+from app import db
+from app.model import Article, ArticleEntity
+from app.services.analysis import refresh_title_entities
+
+
+def test_entity_news(client):
+    articles = Article.query.filter_by(title_index=1).all()
+    db.session.add_all([
+        ArticleEntity(article_id=articles[0].id, entity="Joko Widodo", label="PER", count=2),
+        ArticleEntity(article_id=articles[1].id, entity="joko widodo", label="PER", count=1),
+        ArticleEntity(article_id=articles[1].id, entity="Jakarta", label="LOC", count=1),
+    ])
+    refresh_title_entities([1])
+    db.session.commit()
+
+    response = client.get("/news/entity?name=Joko Widodo")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["total"] == 1
+    assert data["data"][0]["title_index"] == 1
+    assert data["data"][0]["article_count"] == 2
+    assert data["data"][0]["mentions"] == 3
+
+    response = client.get("/news/entity?name=jakarta&label=PER")
+    assert response.get_json()["total"] == 0
+
+
+def test_entity_news_groups_labels(client):
+    articles = Article.query.filter_by(title_index=1).all()
+    db.session.add_all([
+        ArticleEntity(article_id=articles[0].id, entity="Garuda", label="ORG", count=2),
+        ArticleEntity(article_id=articles[1].id, entity="Garuda", label="PER", count=1),
+    ])
+    refresh_title_entities([1])
+    db.session.commit()
+
+    data = client.get("/news/entity?name=garuda").get_json()
+    assert data["total"] == 1
+    assert data["data"][0]["labels"] == ["ORG", "PER"]
+    assert data["data"][0]["mentions"] == 3
+
+    data = client.get("/news/entity?name=garuda&label=per").get_json()
+    assert data["total"] == 1
+    assert data["data"][0]["labels"] == ["PER"]
+
+
+def test_entity_news_requires_name(client):
+    response = client.get("/news/entity")
+    assert response.status_code == 400
@@ -0,0 +1,49 @@
+import numpy as np
+import networkx as nx
+from sklearn.metrics.pairwise import cosine_similarity
+from app.utils.grouping import group_by_similarity
+
+
+def reference_grouping(embeddings, threshold):
+    # Implementasi lama separate_service (networkx, O(n^2)) sebagai pembanding
+    similarity_matrix = cosine_similarity(embeddings)
+    G = nx.Graph()
+    for i in range(len(similarity_matrix)):
+        for j in range(i + 1, len(similarity_matrix)):
+            if similarity_matrix[i, j] >= threshold:
+                G.add_edge(i, j)
+
+    cluster_indices = [-1] * len(embeddings)
+    current = 0
+    for component in nx.connected_components(G):
+        for idx in component:
+            cluster_indices[idx] = current
+        current += 1
+    for idx, cluster_index in enumerate(cluster_indices):
+        if cluster_index == -1:
+            cluster_indices[idx] = current
+            current += 1
+    return cluster_indices
+
+
+def make_embeddings(seed, n_topics=15, per_topic=8, noise=0.15, dim=64):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_topics, dim))
+    topics = rng.integers(0, n_topics, size=n_topics * per_topic)
+    return (centers[topics] + noise * rng.normal(size=(len(topics), dim))).astype(np.float32)
+
+
+def test_group_by_similarity_matches_reference():
+    for seed in range(5):
+        embeddings = make_embeddings(seed)
+        for block_size in (7, 1024):
+            result = group_by_similarity(embeddings, 0.9, block_size=block_size)
+            assert result == reference_grouping(embeddings, 0.9)
+
+
+def test_group_by_similarity_singletons_and_empty():
+    assert group_by_similarity([]) == []
+
+    embeddings = np.eye(4, dtype=np.float32)
+    embeddings[3] = embeddings[1]
+    assert group_by_similarity(embeddings) == [1, 0, 2, 0]
@@ -0,0 +1,17 @@
+from app.utils.registry import registry
+
+
+def test_live(client):
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok"}
+
+
+def test_ready_reflects_warmup(client, monkeypatch):
+    monkeypatch.setattr(registry, "ready", False)
+    assert client.get("/health/ready").status_code == 503
+
+    monkeypatch.setattr(registry, "ready", True)
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.get_json()["ready"] is True
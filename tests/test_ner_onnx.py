@@ -0,0 +1,40 @@
+import os
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("simpletransformers")
+
+from app.utils.ner import LABELS, load_ner_model, predict_text, filter_predictions
+from app.utils.ner_onnx import NER_ONNX_PATH
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(NER_ONNX_PATH), reason="ONNX NER model belum di-export (flask ner export-onnx)"
+)
+
+SAMPLE_TEXTS = [
+    "Presiden Joko Widodo meresmikan jalan tol baru di Jawa Tengah pada Senin pagi.",
+    "Komisi Pemberantasan Korupsi memeriksa mantan pejabat Kementerian Keuangan di Jakarta.",
+    "Bank Indonesia menahan suku bunga acuan, kata Gubernur Perry Warjiyo di Jakarta.",
+    "Warga Surabaya memadati Taman Bungkul untuk merayakan malam tahun baru.",
+]
+
+
+def test_onnx_predictions_match_torch():
+    torch_predictions = predict_text(load_ner_model('torch'), SAMPLE_TEXTS)
+    onnx_predictions = predict_text(load_ner_model('onnx'), SAMPLE_TEXTS)
+
+    total = agree = 0
+    for torch_tokens, onnx_tokens in zip(torch_predictions, onnx_predictions):
+        # Format sama: satu {kata: label} per kata, urutan kata identik
+        assert [list(token) for token in torch_tokens] == [list(token) for token in onnx_tokens]
+        for torch_token, onnx_token in zip(torch_tokens, onnx_tokens):
+            total += 1
+            agree += list(torch_token.values()) == list(onnx_token.values())
+
+    # Kuantisasi int8 boleh mengubah sedikit label
+    assert agree / total >= 0.95
+
+    for entities in filter_predictions(LABELS, onnx_predictions):
+        for entity in entities:
+            assert len(entity) == 1
+            assert all(tag in LABELS and tag != 'O' for tag in entity.values())
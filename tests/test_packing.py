@@ -0,0 +1,32 @@
+from llama_index.core import Document
+
+from app.utils.packing import TRUNCATION_MARK, count_tokens, fit_text, pack_documents, split_chunks
+
+SENTENCES = [f"Kalimat nomor {i} menjelaskan isi berita dengan cukup rinci." for i in range(60)]
+LONG_TEXT = "\n\n".join(" ".join(SENTENCES[i:i + 5]) for i in range(0, len(SENTENCES), 5))
+
+
+def test_split_chunks_respects_sentence_boundaries():
+    chunks = split_chunks(LONG_TEXT, max_tokens=40)
+
+    assert len(chunks) > 1
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks).split() == LONG_TEXT.split()
+
+
+def test_fit_text_keeps_whole_lead_chunks():
+    fitted = fit_text(LONG_TEXT, 120)
+
+    assert fitted.endswith(TRUNCATION_MARK)
+    assert fitted.startswith(SENTENCES[0])
+    assert fitted[:-len(TRUNCATION_MARK)].endswith(".")
+    assert count_tokens(fitted) <= 120
+
+
+def test_pack_documents_under_budget():
+    documents = [Document(text=LONG_TEXT, metadata={'title': f"Berita {i}"}) for i in range(3)]
+
+    context = pack_documents(documents, budget=600)
+    assert count_tokens(context) <= 600
+    assert context.count("[Article") == 3
+    assert pack_documents(documents, budget=600, min_doc_tokens=400) is None
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from app.utils.prices import CsvPriceSource, PriceStore
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "prices.csv")
+
+
+class CountingSource(CsvPriceSource):
+    def __init__(self, path):
+        super().__init__(path)
+        self.calls = []
+
+    def fetch(self, symbol, start, end):
+        self.calls.append((symbol, start, end))
+        return super().fetch(symbol, start, end)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / "prices.sqlite3"), CountingSource(FIXTURE))
+
+
+def test_history_is_served_from_store(store):
+    first = store.get_history("FTT-USD", "2023-01-02", "2023-02-01")
+    second = store.get_history("FTT-USD", "2023-01-09", "2023-01-20")
+
+    assert store.source.calls == [("FTT-USD", "2023-01-02", "2023-02-01")]
+    assert list(first.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert first.index[0].strftime("%Y-%m-%d") == "2023-01-02"
+    assert second.equals(first.loc["2023-01-09":"2023-01-19"])
+
+
+def test_history_fetches_only_missing_ranges(store):
+    store.get_history("FTT-USD", "2023-01-16", "2023-02-01")
+    df = store.get_history("FTT-USD", "2023-01-02", "2023-02-15")
+
+    assert store.source.calls[1:] == [
+        ("FTT-USD", "2023-01-02", "2023-01-16"),
+        ("FTT-USD", "2023-02-01", "2023-02-15"),
+    ]
+    assert len(df) == 32
+    assert df.index.is_monotonic_increasing
+
+
+def test_history_keeps_symbols_apart(store):
+    ftt = store.get_history("FTT-USD", "2023-01-02", "2023-01-10")
+    bbca = store.get_history("BBCA.JK", "2023-01-02", "2023-01-10")
+
+    assert ftt["Open"].iloc[0] < 10 < bbca["Open"].iloc[0]
+
+
+def test_history_falls_back_to_store_when_source_fails(store, monkeypatch):
+    cached = store.get_history("FTT-USD", "2023-01-02", "2023-01-20")
+
+    def fail(symbol, start, end):
+        raise TimeoutError("upstream timeout")
+
+    monkeypatch.setattr(store.source, "fetch", fail)
+    df = store.get_history("FTT-USD", "2023-01-02", "2023-02-01")
+
+    assert df.equals(cached)
+
+
+def test_history_downloads_gap_after_coverage(store):
+    store.get_history("FTT-USD", "2023-01-02", "2023-01-10")
+    store.get_history("FTT-USD", "2023-02-01", "2023-02-10")
+    df = store.get_history("FTT-USD", "2023-01-15", "2023-01-25")
+
+    assert store.source.calls[1] == ("FTT-USD", "2023-01-10", "2023-02-10")
+    assert len(store.source.calls) == 2
+    assert df.index[0].strftime("%Y-%m-%d") == "2023-01-16"
+    assert len(df) == 7
@@ -0,0 +1,17 @@
+import numpy as np
+
+from app.utils.pycuan import forecast_stock_prices
+
+
+def test_forecast_feeds_back_each_step():
+    calls = []
+
+    def forecast_step(x):
+        calls.append(x.copy())
+        return x[:, -1:, 0] + 1
+
+    values = forecast_stock_prices(forecast_step, np.arange(40, dtype=np.float32).reshape(-1, 1), forecast_days=3)
+
+    assert values == [40.0, 41.0, 42.0]
+    assert all(call.shape == (1, 30, 1) for call in calls)
+    assert calls[-1][0, -2:, 0].tolist() == [40.0, 41.0]
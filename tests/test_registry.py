@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.registry import ModelRegistry, registry
+
+
+def test_model_loaded_once_on_first_use():
+    calls = []
+    models = ModelRegistry()
+    models.register('dummy', lambda: calls.append(1) or object())
+
+    assert not models.is_loaded('dummy')
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        loaded = list(executor.map(lambda _: models.get('dummy'), range(16)))
+
+    assert len(calls) == 1
+    assert all(model is loaded[0] for model in loaded)
+
+
+def test_warmup_runs_dummy_inference():
+    seen = []
+    models = ModelRegistry()
+    models.register('dummy', lambda: 'model', warmup=seen.append)
+
+    models.warmup()
+    assert models.loaded() == ['dummy']
+    assert seen == ['model']
+
+
+def test_app_startup_does_not_load_models(client):
+    for name in ('kmeans', 'bias', 'hoax', 'ideology'):
+        assert not registry.is_loaded(name)
+
+
+def test_fork_safe_preload_skips_other_models():
+    calls = []
+    models = ModelRegistry()
+    models.register('kmeans', lambda: calls.append('kmeans') or 'kmeans', fork_safe=True)
+    models.register('keras', lambda: calls.append('keras') or 'keras')
+
+    models.load(models.fork_safe_names())
+    assert calls == ['kmeans']
+
+    models.load([])
+    assert calls == ['kmeans']
+
+
+def test_heavy_models_are_not_fork_safe():
+    import app.utils.pycuan  # noqa: F401
+    import app.utils.ner  # noqa: F401
+
+    names = registry.fork_safe_names()
+    assert 'kmeans' in names
+    assert 'pycuan' not in names and 'ner' not in names
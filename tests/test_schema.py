@@ -0,0 +1,39 @@
+from sqlalchemy import inspect, text
+
+from app import create_app, db
+
+
+def test_schema_upgrade_adds_new_columns_and_tables(tmp_path):
+    class UpgradeConfig:
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'old.db'}"
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    app = create_app(UpgradeConfig)
+    with app.app_context():
+        # Skema sebelum kolom/tabel baru ditambahkan
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE title (id INTEGER PRIMARY KEY, title_index INTEGER UNIQUE, title VARCHAR(255), "
+                "cluster VARCHAR(50), all_summary TEXT, analysis TEXT, keyword TEXT, date DATETIME, image VARCHAR(255))"
+            ))
+            conn.execute(text(
+                "CREATE TABLE articles (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, source VARCHAR(255), "
+                "url VARCHAR(500), image VARCHAR(500), date VARCHAR(100), content TEXT, embedding TEXT, "
+                "bias VARCHAR(50), hoax VARCHAR(50), ideology VARCHAR(50), title_index INTEGER)"
+            ))
+            conn.execute(text("INSERT INTO articles (id, title) VALUES (1, 'lama')"))
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["schema", "upgrade"])
+    assert result.exit_code == 0, result.output
+
+    with app.app_context():
+        inspector = inspect(db.engine)
+        columns = {column['name'] for column in inspector.get_columns('articles')}
+        assert {'cleaned', 'content_hash', 'cluster', 'entities_extracted_at'} <= columns
+        assert {'article_entities', 'title_entities'} <= set(inspector.get_table_names())
+        assert 'ix_articles_content_hash' in {index['name'] for index in inspector.get_indexes('articles')}
+        assert db.session.execute(text("SELECT title FROM articles")).scalar() == 'lama'
+
+    assert "up to date" in runner.invoke(args=["schema", "upgrade"]).output
@@ -0,0 +1,7 @@
+# Crawler dan pipeline /crawlers
+from dotenv import load_dotenv
+load_dotenv()
+
+from app import create_app
+
+app = create_app(profile="ingest")
@@ -0,0 +1,7 @@
+# Endpoint inferensi (bias, hoax, ideology, cluster, LLM, NER)
+from dotenv import load_dotenv
+load_dotenv()
+
+from app import create_app
+
+app = create_app(profile="ml")
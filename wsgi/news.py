@@ -0,0 +1,7 @@
+# API baca /news, tanpa dependensi ML
+from dotenv import load_dotenv
+load_dotenv()
+
+from app import create_app
+
+app = create_app(profile="news")